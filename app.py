@@ -11,7 +11,9 @@ sys.path.insert(0, str(project_root))
 
 from langchain_core.messages import SystemMessage, HumanMessage
 from dotenv import load_dotenv
-from graph.graph import get_graph
+from graph.graph import get_graph, close_graph
+from mcp_client import disconnect_all, warmup
+from console import ainput
 import asyncio
 load_dotenv()
 
@@ -30,41 +32,55 @@ SYSTEM_PROMPT = SystemMessage(
 
 async def main():
 
+    # Bring all MCP servers up in parallel before anything waits on them
+    await warmup()
 
     chatbot =await get_graph()
 
 
     print("Type 'exit' to quit.\n")
 
-    # thread_id still works with MemorySaver (conversation kept in RAM)
+    # thread_id keys the conversation in the SQLite checkpointer (checkpoints.db)
     thread_id = "demo-thread"
-
-    initialized = False
-
-    while True:
-
-        user_input = input("You: ")
-        if user_input.lower().strip() in {"exit", "quit"}:
-            print("GoodBye")
-            break
-
-        if not initialized:
-            messages = [
-                SYSTEM_PROMPT,
-                HumanMessage(content=user_input),
-            ]
-            initialized = True
-        else:
-            messages = [HumanMessage(content=user_input)]
-
-        state = {"messages": messages}
-
-        result = await chatbot.ainvoke(
-            state,
-            config={"configurable": {"thread_id": thread_id}},
-        )
-
-        print("Bot:", result["messages"][-1].content)
+    config = {"configurable": {"thread_id": thread_id}}
+
+    # A resumed thread already carries the system prompt from its first run
+    snapshot = await chatbot.aget_state(config)
+    initialized = bool(snapshot.values.get("messages"))
+
+    try:
+        while True:
+
+            # Wait for input off the loop so MCP sessions keep being serviced
+            try:
+                user_input = await ainput("You: ")
+            except EOFError:
+                user_input = "exit"
+            if user_input.lower().strip() in {"exit", "quit"}:
+                print("GoodBye")
+                break
+
+            if not initialized:
+                messages = [
+                    SYSTEM_PROMPT,
+                    HumanMessage(content=user_input),
+                ]
+                initialized = True
+            else:
+                messages = [HumanMessage(content=user_input)]
+
+            state = {"messages": messages}
+
+            result = await chatbot.ainvoke(state, config=config)
+
+            print("Bot:", result["messages"][-1].content)
+    finally:
+        await close_graph()
+        await disconnect_all()
         
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # main() has already closed the graph and MCP sessions in its finally
+        print("\nGoodBye")
\ No newline at end of file
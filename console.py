@@ -0,0 +1,46 @@
+import asyncio
+import sys
+import threading
+
+
+def _readline(prompt: str) -> str:
+    if sys.stdin.isatty():
+        return input(prompt)
+    # Piped stdin: read unbuffered, since an abandoned read would otherwise
+    # hold the BufferedReader lock that interpreter shutdown needs
+    print(prompt, end="", flush=True)
+    line = sys.stdin.buffer.raw.readline()
+    if not line:
+        raise EOFError("EOF when reading a line")
+    return line.decode(sys.stdin.encoding).rstrip("\r\n")
+
+
+async def ainput(prompt: str = "") -> str:
+    """
+    input() that waits off the event loop.
+
+    asyncio.to_thread would run it on the default executor, whose threads are
+    joined at shutdown, so Ctrl+C during a prompt hung until Enter was pressed.
+    The read runs on a daemon thread instead, which is simply abandoned when
+    the awaiting task is cancelled. EOFError (Ctrl+D) is re-raised here.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(setter, value):
+        if not future.done():
+            setter(value)
+
+    def read():
+        try:
+            args = (future.set_result, _readline(prompt))
+        except BaseException as e:
+            args = (future.set_exception, e)
+        try:
+            loop.call_soon_threadsafe(deliver, *args)
+        except RuntimeError:
+            # Loop already closed; nobody is waiting for the line
+            pass
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
@@ -1,5 +1,11 @@
+import asyncio
+import functools
+import os
+from pathlib import Path
+
+import aiosqlite
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.prebuilt import ToolNode, tools_condition
 
 from graph.nodes.chat_node import chat_node
@@ -7,18 +13,88 @@ from graph.nodes.approval_node import approval_node
 from graph.nodes.routing import route_after_approval
 from graph.state import ChatState
 from graph.tools.tools import get_tools
+from llm.llm import get_llm, reset_llm
 
-async def get_graph():
+CHECKPOINT_DB = os.getenv(
+    "HOODIE_CHECKPOINT_DB",
+    str(Path(__file__).resolve().parent.parent / "checkpoints.db"),
+)
+# Checkpoints kept per thread when pruning; older ones are only needed for time travel
+CHECKPOINT_KEEP_LAST = 10
+# Seconds between prunes while the app runs (a prune also runs when the database is opened)
+CHECKPOINT_PRUNE_INTERVAL = 600
+
+# Compiled graph is built once per process; the checkpointer connection is
+# opened once and shared across rebuilds until close_graph() is called.
+_graph_singleton = None
+_graph_lock = asyncio.Lock()
+_checkpointer = None
+_prune_task = None
+
+
+async def prune_checkpoints(saver: AsyncSqliteSaver, keep_last: int = CHECKPOINT_KEEP_LAST):
+    """Delete all but the newest `keep_last` checkpoints of every thread, plus their pending writes."""
+    await saver.setup()
+    async with saver.lock:
+        # checkpoint_id is a time-ordered uuid, so ordering by it is chronological
+        await saver.conn.execute(
+            """
+            DELETE FROM checkpoints WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, ROW_NUMBER() OVER (
+                        PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                    ) AS rn
+                    FROM checkpoints
+                ) WHERE rn > ?
+            )
+            """,
+            (keep_last,),
+        )
+        await saver.conn.execute(
+            """
+            DELETE FROM writes WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = writes.thread_id
+                  AND c.checkpoint_ns = writes.checkpoint_ns
+                  AND c.checkpoint_id = writes.checkpoint_id
+            )
+            """
+        )
+        await saver.conn.commit()
+
+
+async def _prune_periodically(saver: AsyncSqliteSaver):
+    """Keep pruning checkpoints during long sessions."""
+    while True:
+        await asyncio.sleep(CHECKPOINT_PRUNE_INTERVAL)
+        try:
+            await prune_checkpoints(saver)
+        except Exception as e:
+            print(f"Checkpoint pruning failed: {e}")
+
+
+async def _get_checkpointer():
+    global _checkpointer, _prune_task
+    if _checkpointer is None:
+        conn = await aiosqlite.connect(CHECKPOINT_DB)
+        _checkpointer = AsyncSqliteSaver(conn)
+        await prune_checkpoints(_checkpointer)
+        _prune_task = asyncio.create_task(_prune_periodically(_checkpointer))
+    return _checkpointer
 
-    tools = await get_tools()
+
+async def _build_graph():
+
+    # The model is bound to the tools once here instead of being fetched every turn
+    tools, llm = await asyncio.gather(get_tools(), get_llm())
 
     tool_node = ToolNode(tools)
     
-    memory = MemorySaver()
+    checkpointer = await _get_checkpointer()
 
     graph = StateGraph(ChatState)
 
-    graph.add_node("chat_node", chat_node)
+    graph.add_node("chat_node", functools.partial(chat_node, llm=llm))
     graph.add_node("approval", approval_node)
     graph.add_node("tools", tool_node)
 
@@ -46,6 +122,34 @@ async def get_graph():
     
     graph.add_edge("tools", "chat_node")
 
-    chatbot = graph.compile(checkpointer=memory)
+    chatbot = graph.compile(checkpointer=checkpointer)
+
+    return chatbot
+
+
+async def get_graph():
+    global _graph_singleton
+    async with _graph_lock:
+        if _graph_singleton is None:
+            _graph_singleton = await _build_graph()
+    return _graph_singleton
+
+
+def invalidate_graph():
+    """Drop the cached graph so the next get_graph() rebuilds it (e.g. after tool config changes)."""
+    global _graph_singleton
+    _graph_singleton = None
+    reset_llm()
+
 
-    return chatbot
\ No newline at end of file
+async def close_graph():
+    """Drop the cached graph and close the checkpoint database connection."""
+    global _checkpointer, _prune_task
+    async with _graph_lock:
+        invalidate_graph()
+        if _prune_task is not None:
+            _prune_task.cancel()
+            _prune_task = None
+        if _checkpointer is not None:
+            await _checkpointer.conn.close()
+            _checkpointer = None
@@ -1,4 +1,17 @@
 from graph.state import ChatState
+from console import ainput
+
+APPROVE_ANSWERS = frozenset({'yes', 'y'})
+REJECT_ANSWERS = frozenset({'no', 'n'})
+
+# Read-only tools that run without asking
+AUTO_APPROVED_TOOLS = frozenset({
+    # filesystem MCP server
+    "list_directory", "read_file", "get_file_info", "search_files",
+    # process management
+    "list_processes", "get_process_info", "get_system_info",
+    "find_process_by_name", "list_disk_drives",
+})
 
 async def approval_node(state: ChatState):
     """Ask user for approval before executing tools."""
@@ -9,19 +22,27 @@ async def approval_node(state: ChatState):
     
     # Check if there are tool calls to approve
     if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
+        if all(tool_call['name'] in AUTO_APPROVED_TOOLS for tool_call in last_message.tool_calls):
+            return {"approved": True}
+
         print("\n The AI wants to use the following tools:")
         for tool_call in last_message.tool_calls:
             print(f"  - {tool_call['name']}")
         
         while True:
-            approval = input("\nApprove tool execution? (yes/no): ").lower().strip()
-            if approval in {'yes', 'y'}:
+            # input() blocks, so wait for it off the event loop
+            try:
+                approval = (await ainput("\nApprove tool execution? (yes/no): ")).lower().strip()
+            except EOFError:
+                # stdin closed; never run tools nobody approved
+                return {"approved": False}
+            if approval in APPROVE_ANSWERS:
                 return {"approved": True}
-            elif approval in {'no', 'n'}:
+            elif approval in REJECT_ANSWERS:
                 return {"approved": False}
             else:
     
                 print("Please answer 'yes' or 'no'")
     
     # No tool calls, continue normally
-    return {"approved": True}
\ No newline at end of file
+    return {"approved": True}
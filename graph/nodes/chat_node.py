@@ -1,25 +1,71 @@
-from llm.llm import get_llm
+import json
+
+import tiktoken
 from graph.state import ChatState
 from dotenv import load_dotenv
-from langchain_core.messages import AIMessage
-from langchain_core.messages import trim_messages
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 load_dotenv()
 
-async def chat_node(state: ChatState):
-    """LLM node that may answer or request a tool call."""
-    
-    llm = await get_llm()
+# Local tokenizer, loaded once, so trimming never goes over the network
+_ENCODING = tiktoken.encoding_for_model("gpt-4o-mini")
+_TOKEN_COUNT_KEY = "_tok"
 
-    messages = state["messages"]
-    
-    # Trim to X tokens, keep system message, prefer recent messages
-    messages = trim_messages(
-        messages,
-        max_tokens=50000,
-        strategy="last",
-        token_counter=llm,
-        include_system=True,
+# History is trimmed only once it exceeds TRIM_UPPER tokens, and then in chunks
+# of at least TRIM_UPPER - TRIM_LOWER tokens. The first SINK_SIZE messages
+# (system prompt + first user turn) are always kept, so the prompt prefix stays
+# identical for many turns and the provider's prompt cache keeps matching.
+TRIM_UPPER = 50000
+TRIM_LOWER = 40000
+SINK_SIZE = 2
+
+
+def count_tokens(message: BaseMessage) -> int:
+    """Token count of a single message, cached on the message so each turn only encodes new ones."""
+    cached = message.additional_kwargs.get(_TOKEN_COUNT_KEY)
+    if cached is not None:
+        return cached
+
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    tokens = len(_ENCODING.encode(content, disallowed_special=()))
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        tokens += len(_ENCODING.encode(tool_call["name"] + json.dumps(tool_call["args"]), disallowed_special=()))
+
+    message.additional_kwargs[_TOKEN_COUNT_KEY] = tokens
+    return tokens
+
+
+def trim_history(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """Keep the attention-sink prefix and drop the oldest turns in large chunks."""
+    total = sum(count_tokens(m) for m in messages)
+    if total <= TRIM_UPPER:
+        return messages
+
+    sink, history = messages[:SINK_SIZE], messages[SINK_SIZE:]
+
+    # Never cut into the current turn
+    last_turn = max(
+        (i for i, m in enumerate(history) if isinstance(m, HumanMessage)),
+        default=0,
     )
+
+    # Cut points depend only on the oldest messages, so they stay put as the
+    # conversation grows; cuts land on user turns to avoid orphaned tool results
+    start = 0
+    chunk = TRIM_UPPER - TRIM_LOWER
+    while total > TRIM_UPPER and start < last_turn:
+        dropped = 0
+        while start < last_turn and (dropped < chunk or not isinstance(history[start], HumanMessage)):
+            dropped += count_tokens(history[start])
+            start += 1
+        total -= dropped
+
+    return sink + history[start:]
+
+
+async def chat_node(state: ChatState, llm):
+    """LLM node that may answer or request a tool call."""
+
+    messages = trim_history(state["messages"])
     
     
     if state.get("approved") == False:
@@ -27,9 +73,7 @@ async def chat_node(state: ChatState):
         messages = messages + [
             AIMessage(content="The user rejected the tool execution. I'll answer without using tools If possible otherwise Say sorry.")
         ]
-        # Unbind tools temporarily to force a text response
-        response = await llm.ainvoke(messages)
-    else:
-        response = await llm.ainvoke(messages)
 
-    return {"messages": [response], "approved": True}  # Reset approval
\ No newline at end of file
+    response = await llm.ainvoke(messages)
+
+    return {"messages": [response], "approved": True}  # Reset approval
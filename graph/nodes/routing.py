@@ -1,9 +1,8 @@
 from graph.state import ChatState
 from typing import Literal
 
+_APPROVAL_ROUTES = {True: "tools", False: "chat_node"}
+
 def route_after_approval(state: ChatState) -> Literal["tools", "chat_node"]:
     """Route to tools if approved, otherwise back to chat."""
-    if state.get("approved", False):
-        return "tools"
-    else:
-        return "chat_node"
\ No newline at end of file
+    return _APPROVAL_ROUTES[bool(state.get("approved", False))]
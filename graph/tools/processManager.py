@@ -1,7 +1,11 @@
 from langchain_core.tools import tool
 import psutil
 import platform
-from datetime import datetime
+import time
+
+_TIME_FMT = "%Y-%m-%d %H:%M:%S"
+_MB = 1 << 20
+_GB = 1 << 30
 
 # ============================================
 # PROCESS MANAGER TOOLS (Cross-platform)
@@ -22,16 +26,26 @@ def list_processes(limit: int = 20, sort_by: str = "memory") -> str:
     print(f"Listing top {limit} processes sorted by {sort_by}")
     try:
         processes = []
+
+        # memory_percent() would read memory_info() again for every process;
+        # process_iter already fetched it, so apply the same rss / total formula
+        # to that. CPU is only needed up front when it is the sort key;
+        # everything else is fetched for the top rows only.
+        total_memory = psutil.virtual_memory().total
+        attrs = ['pid', 'name', 'memory_info']
+        if sort_by == "cpu":
+            attrs.append('cpu_percent')
         
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'status']):
+        for proc in psutil.process_iter(attrs):
             try:
                 pinfo = proc.info
+                memory_info = pinfo['memory_info']
                 processes.append({
+                    'proc': proc,
                     'pid': pinfo['pid'],
                     'name': pinfo['name'],
-                    'cpu': pinfo['cpu_percent'] or 0,
-                    'memory': pinfo['memory_percent'] or 0,
-                    'status': pinfo['status']
+                    'cpu': pinfo.get('cpu_percent') or 0,
+                    'memory': memory_info.rss / total_memory * 100 if memory_info else 0,
                 })
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                 continue
@@ -44,6 +58,15 @@ def list_processes(limit: int = 20, sort_by: str = "memory") -> str:
         
         # Limit results
         processes = processes[:limit]
+
+        for proc in processes:
+            try:
+                with proc['proc'].oneshot():
+                    proc['status'] = proc['proc'].status()
+                    if sort_by != "cpu":
+                        proc['cpu'] = proc['proc'].cpu_percent() or 0
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                proc['status'] = "unknown"
         
         results = []
         for proc in processes:
@@ -79,12 +102,12 @@ def get_process_info(pid: int) -> str:
             f"Status: {proc.status()}",
             f"CPU: {proc.cpu_percent(interval=0.1):.1f}%",
             f"Memory: {proc.memory_percent():.1f}%",
-            f"Memory (RSS): {proc.memory_info().rss / 1024 / 1024:.1f} MB",
+            f"Memory (RSS): {proc.memory_info().rss / _MB:.1f} MB",
             f"Threads: {proc.num_threads()}",
         ]
         
         try:
-            create_time = datetime.fromtimestamp(proc.create_time()).strftime('%Y-%m-%d %H:%M:%S')
+            create_time = time.strftime(_TIME_FMT, time.localtime(proc.create_time()))
             info.append(f"Created: {create_time}")
         except:
             pass
@@ -170,13 +193,13 @@ def get_system_info() -> str:
             f"  Usage: {cpu_percent}%",
             f"  Cores: {psutil.cpu_count(logical=False)} physical, {psutil.cpu_count(logical=True)} logical",
             f"\nMemory:",
-            f"  Total: {memory.total / 1024 / 1024 / 1024:.1f} GB",
-            f"  Used: {memory.used / 1024 / 1024 / 1024:.1f} GB ({memory.percent}%)",
-            f"  Available: {memory.available / 1024 / 1024 / 1024:.1f} GB",
+            f"  Total: {memory.total / _GB:.1f} GB",
+            f"  Used: {memory.used / _GB:.1f} GB ({memory.percent}%)",
+            f"  Available: {memory.available / _GB:.1f} GB",
             f"\n{disk_label}:",
-            f"  Total: {disk.total / 1024 / 1024 / 1024:.1f} GB",
-            f"  Used: {disk.used / 1024 / 1024 / 1024:.1f} GB ({disk.percent}%)",
-            f"  Free: {disk.free / 1024 / 1024 / 1024:.1f} GB",
+            f"  Total: {disk.total / _GB:.1f} GB",
+            f"  Used: {disk.used / _GB:.1f} GB ({disk.percent}%)",
+            f"  Free: {disk.free / _GB:.1f} GB",
         ]
         
         return "\n".join(info)
@@ -200,15 +223,26 @@ def find_process_by_name(name: str) -> str:
     try:
         matches = []
         
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        needle = name.lower()
+        
+        # Filter on name alone; CPU/memory are only read for the matches
+        for proc in psutil.process_iter(['pid', 'name']):
             try:
-                proc_name = proc.info['name']
+                proc_name = proc.info['name'] or ""
                 # Case-insensitive search
-                if name.lower() in proc_name.lower():
+                if needle in proc_name.lower():
+                    # Other users' processes can deny these reads; still list the match
+                    cpu = memory = 0
+                    try:
+                        with proc.oneshot():
+                            cpu = proc.cpu_percent() or 0
+                            memory = proc.memory_percent() or 0
+                    except psutil.AccessDenied:
+                        pass
                     matches.append(
                         f"PID: {proc.info['pid']} | {proc_name}\n"
-                        f"  CPU: {proc.info['cpu_percent'] or 0:.1f}% | "
-                        f"Memory: {proc.info['memory_percent'] or 0:.1f}%\n"
+                        f"  CPU: {cpu:.1f}% | "
+                        f"Memory: {memory:.1f}%\n"
                     )
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
@@ -241,9 +275,9 @@ def list_disk_drives() -> str:
                     f"Drive: {partition.device}\n"
                     f"  Mount Point: {partition.mountpoint}\n"
                     f"  File System: {partition.fstype}\n"
-                    f"  Total: {usage.total / 1024 / 1024 / 1024:.1f} GB\n"
-                    f"  Used: {usage.used / 1024 / 1024 / 1024:.1f} GB ({usage.percent}%)\n"
-                    f"  Free: {usage.free / 1024 / 1024 / 1024:.1f} GB\n"
+                    f"  Total: {usage.total / _GB:.1f} GB\n"
+                    f"  Used: {usage.used / _GB:.1f} GB ({usage.percent}%)\n"
+                    f"  Free: {usage.free / _GB:.1f} GB\n"
                 )
             except PermissionError:
                 drives.append(
@@ -1,4 +1,5 @@
 import os
+import asyncio
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from graph.tools.tools import get_tools
@@ -15,6 +16,9 @@ async def get_gptModel():
     models_to_try = [
         "gpt-4o-mini",      
     ]
+
+    # Load tools (MCP handshakes) while the model probes run
+    tools_task = asyncio.ensure_future(get_tools())
     
     for model_id in models_to_try:
         try:
@@ -27,18 +31,19 @@ async def get_gptModel():
 
             )
             
-            # Test the connection with a simple call
-            chat_model.invoke("test")
+            # Optional billed probe; by default errors surface on the first real call
+            if os.getenv("HOODIE_LLM_HEALTHCHECK") == "1":
+                await chat_model.ainvoke("test")
             
             print(f"✓ Successfully initialized {model_id}")
             
-            tools =await get_tools()
+            tools = await tools_task
             # print(tools)
-            chat_model_with_tools = chat_model.bind_tools(tools)
-            return chat_model_with_tools
+            return chat_model.bind_tools(tools)
             
         except Exception as e:
             print(f"✗ Failed with {model_id}: {e}")
             continue
     
+    tools_task.cancel()
     raise RuntimeError("All model initialization attempts failed")
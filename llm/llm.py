@@ -1,13 +1,23 @@
 # from llm.ollamaModel import get_llm
 # from llm.hugginfaceModel import get_llm
 # from llm.geminiModel import get_llm
+import asyncio
 from llm.gptModel import get_gptModel
 
 _model = None
+_model_lock = asyncio.Lock()
 
 async def get_llm():
     global _model
-    if _model is None:
-        _model = await get_gptModel()
+    # Lock so concurrent first callers share one build instead of racing
+    async with _model_lock:
+        if _model is None:
+            _model = await get_gptModel()
     
     return _model
+
+
+def reset_llm():
+    """Forget the cached model so the next get_llm() rebuilds it against the current tools."""
+    global _model
+    _model = None
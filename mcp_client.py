@@ -1,27 +1,65 @@
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+import asyncio
+import json
 import os
+import shutil
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# The bundled Python MCP servers run under the same interpreter as the agent
+MCP_SERVER_DIR = Path(__file__).resolve().parent / "mcp_server"
+
+
+@lru_cache(maxsize=None)
+def _npm_global_root():
+    """Global node_modules directory, or None when npm is unavailable."""
+    npm = shutil.which("npm")
+    if not npm:
+        return None
+    try:
+        result = subprocess.run([npm, "root", "-g"], capture_output=True, text=True, timeout=30, check=True)
+    except (subprocess.SubprocessError, OSError):
+        return None
+    root = result.stdout.strip()
+    return Path(root) if root else None
+
+
+def _node_server(package: str, *args: str) -> dict:
+    """
+    Launch command for an npm MCP server.
+
+    If the package is installed globally (npm i -g <package>) its entry script
+    is run with node directly, skipping npx's package resolution on every
+    spawn; otherwise this falls back to npx.
+    """
+    root = _npm_global_root()
+    node = shutil.which("node")
+    manifest = root / package / "package.json" if root else None
+    if node and manifest and manifest.exists():
+        bin_field = json.loads(manifest.read_text(encoding="utf-8")).get("bin")
+        entry = bin_field if isinstance(bin_field, str) else next(iter((bin_field or {}).values()), None)
+        if entry:
+            return {"command": node, "args": [str(manifest.parent / entry), *args]}
+    return {"command": "npx", "args": [package, *args]}
+
+
 client = MultiServerMCPClient(
      {
         "filesystem": {
             "transport": "stdio",
-            "command": "npx",
-            "args": [
-                "@modelcontextprotocol/server-filesystem",
-                "D:/",
-            ],
+            **_node_server("@modelcontextprotocol/server-filesystem", "D:/"),
         }, 
 
         # Browser automation with Playwright
         "playwright": {
             "transport": "stdio",
-            "command": "npx",
-            "args": [
-                "@executeautomation/playwright-mcp-server"
-            ],
+            **_node_server("@executeautomation/playwright-mcp-server"),
             "env": {
                 "PLAYWRIGHT_HEADLESS": "false",
                 "PLAYWRIGHT_KEEP_OPEN": "true",  # If supported
@@ -32,26 +70,20 @@ client = MultiServerMCPClient(
         # Memory/context storage
         "memory": {
             "transport": "stdio",
-            "command": "npx",
-            "args": [
-                "@modelcontextprotocol/server-memory"
-            ],
+            **_node_server("@modelcontextprotocol/server-memory"),
         },
         
     #     # Sequential thinking for complex tasks
         "sequential-thinking": {
             "transport": "stdio",
-            "command": "npx",
-            "args": [
-                "@modelcontextprotocol/server-sequential-thinking"
-            ],
+            **_node_server("@modelcontextprotocol/server-sequential-thinking"),
         },
         
         
         "github": {
             "transport": "stdio",
-            "command": "python",
-            "args": ["D:\AI_agents\hoodie\mcp_server\github_mcp_server.py"],
+            "command": sys.executable,
+            "args": [str(MCP_SERVER_DIR / "github_mcp_server.py")],
             "env": {
                 "GITHUB_TOKEN": os.getenv("GITHUB_TOKEN")
             }
@@ -59,9 +91,9 @@ client = MultiServerMCPClient(
 
         
         "google-drive": {
-        "transport": "stdio",
-         "command": "D:\\AI_agents\\hoodie\\venv\\Scripts\\python.exe",
-        "args": ["D:\\AI_agents\\hoodie\\mcp_server\\google_drive_mcp_server.py"]
+            "transport": "stdio",
+            "command": sys.executable,
+            "args": [str(MCP_SERVER_DIR / "google_drive_mcp_server.py")],
         }
     
     }
@@ -69,5 +101,81 @@ client = MultiServerMCPClient(
 )
 
 
+# One long-lived session per server, so tool calls reuse the running
+# subprocess instead of spawning it and redoing the MCP handshake every time.
+# Each session is opened and closed inside its own task because the stdio
+# transport's cancel scopes must exit in the task that entered them.
+_session_tasks: dict[str, asyncio.Task] = {}
+_shutdown = asyncio.Event()
+
+# Tools of each live session. Tools are discovered once per process and later
+# calls reuse the list, until a session dies and its server is evicted.
+_server_tools: dict[str, list] = {}
+_mcp_tools = None
+_mcp_tools_lock = asyncio.Lock()
+
+
+def _evict(name: str):
+    """Forget a dead session so the next get_mcp_tools() reconnects its server."""
+    global _mcp_tools
+    if _session_tasks.get(name) is asyncio.current_task():
+        del _session_tasks[name]
+    _server_tools.pop(name, None)
+    _mcp_tools = None
+
+
+async def _hold_session(name: str, ready: asyncio.Future):
+    try:
+        async with client.session(name) as session:
+            _server_tools[name] = await load_mcp_tools(session)
+            ready.set_result(_server_tools[name])
+            await _shutdown.wait()
+    except Exception as e:
+        if not ready.done():
+            ready.set_exception(e)
+            return
+        print(f"✗ MCP server '{name}' session failed: {e!r}", file=sys.stderr)
+        _evict(name)
+
+
+async def connect(name: str):
+    """Open a persistent session to one server and return its tools."""
+    ready = asyncio.get_running_loop().create_future()
+    _session_tasks[name] = asyncio.create_task(_hold_session(name, ready))
+    return await ready
+
+
+async def connect_all():
+    # Boot every server at once so startup costs the slowest server, not the sum.
+    # A server that fails to start is reported and skipped instead of taking
+    # the whole agent down with it. Servers that are already up are kept.
+    names = [name for name in client.connections if name not in _server_tools]
+    results = await asyncio.gather(*(connect(name) for name in names), return_exceptions=True)
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            print(f"✗ MCP server '{name}' failed to start: {result}")
+    return [tool for name in client.connections for tool in _server_tools.get(name, ())]
+
+
+async def disconnect_all():
+    """Close every persistent session and forget the cached tools."""
+    global _mcp_tools
+    _shutdown.set()
+    await asyncio.gather(*_session_tasks.values(), return_exceptions=True)
+    _session_tasks.clear()
+    _server_tools.clear()
+    _shutdown.clear()
+    _mcp_tools = None
+
+
 async def get_mcp_tools():
-    return await client.get_tools()
+    global _mcp_tools
+    async with _mcp_tools_lock:
+        if _mcp_tools is None:
+            _mcp_tools = await connect_all()
+    return _mcp_tools
+
+
+async def warmup():
+    """Start every MCP server concurrently; call at boot, before the first prompt."""
+    await get_mcp_tools()
@@ -13,598 +13,953 @@
 """
 
 import os
+import re
+import sys
 import json
+import time
+import random
 import asyncio
+import itertools
+from binascii import a2b_base64
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from typing import Any
+from urllib.parse import parse_qs, quote, urlparse
 import httpx
 from mcp.server import Server
-from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
+from mcp.types import Tool, TextContent
 from mcp.server.stdio import stdio_server
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # GitHub API configuration
 GITHUB_API_BASE = "https://api.github.com"
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
-if not GITHUB_TOKEN:
-    raise ValueError("GITHUB_TOKEN environment variable must be set")
+# Headers and client are built on the first API call, so the server can start
+# and list its tools before a token is configured
+_HEADERS: dict | None = None
+_CLIENT: httpx.AsyncClient | None = None
 
-HEADERS = {
-    "Authorization": f"Bearer {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github+json",
-    "X-GitHub-Api-Version": "2022-11-28"
-}
+
+def _headers() -> dict:
+    """Request headers, built once from GITHUB_TOKEN"""
+    global _HEADERS
+    if _HEADERS is None:
+        token = os.getenv("GITHUB_TOKEN")
+        if not token:
+            raise ValueError("GITHUB_TOKEN environment variable must be set")
+        _HEADERS = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28"
+        }
+    return _HEADERS
+
+
+def _client() -> httpx.AsyncClient:
+    """Shared client so every API call reuses pooled keep-alive connections.
+
+    HTTP/2 (via h2) multiplexes concurrent requests over a single connection.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = httpx.AsyncClient(
+            base_url=GITHUB_API_BASE,
+            headers=_headers(),
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=1000),
+            timeout=30.0,
+        )
+    return _CLIENT
+
+
+# GET response cache. Commits and file contents addressed by a full SHA never
+# change, so they stay until evicted; everything else expires after _CACHE_TTL.
+# Only successful responses are stored. The cache is bounded by entry count and
+# by total response size, and single bodies above _CACHE_MAX_BODY are not kept.
+_CACHE_MAX_ENTRIES = 1024
+_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_CACHE_MAX_BODY = 1024 * 1024
+_CACHE_TTL = 60.0
+_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+_cache: "OrderedDict[tuple, tuple[float, int, Any]]" = OrderedDict()
+_cache_bytes = 0
+
+
+def _is_immutable(endpoint: str, params: dict) -> bool:
+    """Whether the endpoint addresses content pinned to a full commit SHA"""
+    if "/commits/" in endpoint:
+        return bool(_SHA_RE.match(endpoint.rsplit("/", 1)[-1]))
+    if "/contents/" in endpoint:
+        return bool(_SHA_RE.match(str(params.get("ref", ""))))
+    return False
+
+
+def _cache_get(key: tuple) -> Any:
+    global _cache_bytes
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, size, value = entry
+    if expires_at < time.monotonic():
+        del _cache[key]
+        _cache_bytes -= size
+        return None
+    _cache.move_to_end(key)
+    return value
+
+
+def _cache_put(key: tuple, value: Any, immutable: bool, size: int) -> None:
+    global _cache_bytes
+    if size > _CACHE_MAX_BODY:
+        return
+    ttl = float("inf") if immutable else _CACHE_TTL
+    previous = _cache.pop(key, None)
+    if previous is not None:
+        _cache_bytes -= previous[1]
+    _cache[key] = (time.monotonic() + ttl, size, value)
+    _cache_bytes += size
+    while len(_cache) > _CACHE_MAX_ENTRIES or _cache_bytes > _CACHE_MAX_BYTES:
+        _, (_, evicted, _) = _cache.popitem(last=False)
+        _cache_bytes -= evicted
+
+
+def _cache_clear() -> None:
+    global _cache_bytes
+    _cache.clear()
+    _cache_bytes = 0
+
+
+# Rate limiting: bounded concurrency, and a shared gate that is closed while
+# GitHub tells us to back off so every in-flight task waits together
+_MAX_ATTEMPTS = 5
+_MAX_RETRY_DELAY = 60.0
+_REQUEST_SEMAPHORE = asyncio.Semaphore(64)
+_rate_limit_open = asyncio.Event()
+_rate_limit_open.set()
 
 
-async def github_api_request(endpoint: str, method: str = "GET", data: dict = None) -> dict:
+def _rate_limit_delay(response: httpx.Response, attempt: int) -> float | None:
+    """Seconds to wait before retrying a rate-limited response, or None if it is not rate limited"""
+    if response.status_code not in (403, 429):
+        return None
+    headers = response.headers
+    if "Retry-After" in headers:
+        return float(headers["Retry-After"])
+    if headers.get("X-RateLimit-Remaining") == "0":
+        return max(0.0, float(headers.get("X-RateLimit-Reset", 0)) - time.time()) + 1
+    if response.status_code == 429:
+        return min(_MAX_RETRY_DELAY, 2 ** attempt) + random.random()
+    # Plain 403: a permission error, not a rate limit
+    return None
+
+
+async def _pause(delay: float) -> None:
+    """Hold every request until the rate limit window has passed"""
+    if not _rate_limit_open.is_set():
+        await _rate_limit_open.wait()
+        return
+    _rate_limit_open.clear()
+    try:
+        await asyncio.sleep(delay)
+    finally:
+        _rate_limit_open.set()
+
+
+async def _send(endpoint: str, method: str, data: dict = None, params: dict = None) -> httpx.Response:
+    """Send a request, backing off and retrying while GitHub rate limits it"""
+    for attempt in range(_MAX_ATTEMPTS):
+        await _rate_limit_open.wait()
+        async with _REQUEST_SEMAPHORE:
+            response = await _client().request(method, endpoint, params=params, json=data)
+
+        delay = _rate_limit_delay(response, attempt)
+        # Give up on the last attempt or when the reset is too far away to wait for
+        if delay is None or delay > _MAX_RETRY_DELAY or attempt == _MAX_ATTEMPTS - 1:
+            return response
+        await _pause(delay)
+
+
+def _loads(content: bytes) -> Any:
+    """Decode a JSON response body, using orjson when it is installed"""
+    if not content:
+        return {}
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+async def _request(endpoint: str, method: str = "GET", data: dict = None, params: dict = None) -> tuple[Any, dict]:
+    """Make a request and return the decoded body with the parsed Link header"""
+    # Unset optional arguments are left out of the query string; httpx encodes the rest
+    params = {k: v for k, v in (params or {}).items() if v not in (None, "")}
+    key = (endpoint, tuple(sorted(params.items())))
+
+    if method == "GET":
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+    else:
+        # Writes can change any listing we have cached
+        _cache_clear()
+
+    response = await _send(endpoint, method, data, params)
+    response.raise_for_status()
+    result = (_loads(response.content), response.links)
+    if method == "GET":
+        _cache_put(key, result, _is_immutable(endpoint, params), len(response.content))
+    return result
+
+
+async def github_api_request(endpoint: str, method: str = "GET", data: dict = None, params: dict = None) -> dict:
     """Make a request to the GitHub API"""
-    url = f"{GITHUB_API_BASE}{endpoint}"
-    
-    async with httpx.AsyncClient() as client:
-        if method == "GET":
-            response = await client.get(url, headers=HEADERS)
-        elif method == "POST":
-            response = await client.post(url, headers=HEADERS, json=data)
-        elif method == "PATCH":
-            response = await client.patch(url, headers=HEADERS, json=data)
-        elif method == "DELETE":
-            response = await client.delete(url, headers=HEADERS)
-        
-        response.raise_for_status()
-        return response.json() if response.content else {}
+    result, _ = await _request(endpoint, method, data, params)
+    return result
+
+
+_DEFAULT_MAX_PAGES = 10
+
+
+async def github_api_paginate(endpoint: str, params: dict = None, max_pages: int = _DEFAULT_MAX_PAGES,
+                              key: str = None) -> list:
+    """Fetch up to max_pages pages of a list endpoint; pages after the first are fetched concurrently.
+
+    For endpoints that wrap results in an object (e.g. search), key names the list field.
+    """
+    params = dict(params or {})
+    if params.get("per_page") is None:
+        params["per_page"] = 100
+
+    first, links = await _request(endpoint, params=params)
+    if key:
+        first = first[key]
+    last = links.get("last")
+    if not last:
+        return first
+
+    last_page = min(int(parse_qs(urlparse(last["url"]).query)["page"][0]), max_pages)
+    # Concurrency is bounded by the request semaphore
+    rest = await asyncio.gather(
+        *(github_api_request(endpoint, params={**params, "page": page}) for page in range(2, last_page + 1))
+    )
+    if key:
+        rest = [page[key] for page in rest]
+    return list(itertools.chain(first, *rest))
+
+
+async def _fetch_list(endpoint: str, params: dict, arguments: dict, key: str = None) -> list:
+    """Fetch a list endpoint, following pagination when the caller asked for it"""
+    if arguments.get("paginate"):
+        return await github_api_paginate(
+            endpoint, params, int(arguments.get("max_pages", _DEFAULT_MAX_PAGES)), key=key
+        )
+    data = await github_api_request(endpoint, params=params)
+    return data[key] if key else data
+
+
+def _issue_search_query(owner: str, repo: str, state: str, labels: str) -> str:
+    """Search query matching only issues (no pull requests) of a repository"""
+    terms = [f"repo:{owner}/{repo}", "is:issue"]
+    if state != "all":
+        terms.append(f"state:{state}")
+    terms.extend(f'label:"{label.strip()}"' for label in labels.split(",") if label.strip())
+    return " ".join(terms)
+
+
+def _repo_path(owner: str, repo: str) -> str:
+    """API path of a repository, with each segment URL-encoded"""
+    return f"/repos/{quote(owner, safe='')}/{quote(repo, safe='')}"
+
+
+async def aclose():
+    """Close the shared HTTP client, if one was opened"""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
+# Result rows for the large list tools. Slotted dataclasses are smaller than
+# dicts and orjson serializes them natively without an intermediate dict.
+@dataclass(slots=True)
+class RepoSummary:
+    name: str
+    full_name: str
+    description: str | None
+    private: bool
+    html_url: str
+    language: str | None
+    stargazers_count: int
+    forks_count: int
+    updated_at: str
+
+
+@dataclass(slots=True)
+class CommitSummary:
+    sha: str
+    message: str
+    author: str
+    date: str
+    url: str
+
+
+def _dump(obj: Any) -> str:
+    """Serialize a tool result as indented JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, default=asdict)
 
 
 # Initialize MCP server
 app = Server("github-server")
 
 
+# Tool definitions are static, so they are built once at import
+_TOOLS: list[Tool] = [
+    Tool(
+        name="get_username",
+        description="Get the authenticated user's GitHub username and profile information",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": []
+        }
+    ),
+    Tool(
+        name="get_repos_list",
+        description="Get list of repositories for the authenticated user or a specific user",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "username": {
+                    "type": "string",
+                    "description": "GitHub username (optional, defaults to authenticated user)"
+                },
+                "type": {
+                    "type": "string",
+                    "enum": ["all", "owner", "member"],
+                    "description": "Type of repositories to list (default: owner)"
+                },
+                "sort": {
+                    "type": "string",
+                    "enum": ["created", "updated", "pushed", "full_name"],
+                    "description": "Sort order (default: updated)"
+                },
+                "paginate": {
+                    "type": "boolean",
+                    "description": "Fetch all pages instead of only the first (default: false)"
+                },
+                "max_pages": {
+                    "type": "number",
+                    "description": "Maximum number of pages to fetch when paginating (default: 10)"
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="get_specific_repo",
+        description="Get detailed information about a specific repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    Tool(
+        name="get_commits",
+        description="Get commit history for a repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "sha": {
+                    "type": "string",
+                    "description": "Branch name or commit SHA (optional)"
+                },
+                "per_page": {
+                    "type": "number",
+                    "description": "Number of commits to return (max 100, default 30)"
+                },
+                "paginate": {
+                    "type": "boolean",
+                    "description": "Fetch all pages instead of only the first (default: false)"
+                },
+                "max_pages": {
+                    "type": "number",
+                    "description": "Maximum number of pages to fetch when paginating (default: 10)"
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    Tool(
+        name="get_specific_commit",
+        description="Get details of a specific commit",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "sha": {
+                    "type": "string",
+                    "description": "Commit SHA"
+                }
+            },
+            "required": ["owner", "repo", "sha"]
+        }
+    ),
+    Tool(
+        name="get_pull_requests",
+        description="Get list of pull requests for a repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "state": {
+                    "type": "string",
+                    "enum": ["open", "closed", "all"],
+                    "description": "PR state (default: open)"
+                },
+                "sort": {
+                    "type": "string",
+                    "enum": ["created", "updated", "popularity", "long-running"],
+                    "description": "Sort order (default: created)"
+                },
+                "paginate": {
+                    "type": "boolean",
+                    "description": "Fetch all pages instead of only the first (default: false)"
+                },
+                "max_pages": {
+                    "type": "number",
+                    "description": "Maximum number of pages to fetch when paginating (default: 10)"
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    Tool(
+        name="get_specific_pr",
+        description="Get details of a specific pull request",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "pr_number": {
+                    "type": "number",
+                    "description": "Pull request number"
+                }
+            },
+            "required": ["owner", "repo", "pr_number"]
+        }
+    ),
+    Tool(
+        name="get_issues",
+        description="Get list of issues for a repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "state": {
+                    "type": "string",
+                    "enum": ["open", "closed", "all"],
+                    "description": "Issue state (default: open)"
+                },
+                "labels": {
+                    "type": "string",
+                    "description": "Comma-separated list of label names"
+                },
+                "paginate": {
+                    "type": "boolean",
+                    "description": "Fetch all pages instead of only the first (default: false)"
+                },
+                "max_pages": {
+                    "type": "number",
+                    "description": "Maximum number of pages to fetch when paginating (default: 10)"
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    Tool(
+        name="get_branches",
+        description="Get list of branches for a repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    Tool(
+        name="get_file_contents",
+        description="Get contents of a file from a repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "File path in the repository"
+                },
+                "ref": {
+                    "type": "string",
+                    "description": "Branch name, tag, or commit SHA (optional)"
+                }
+            },
+            "required": ["owner", "repo", "path"]
+        }
+    ),
+    Tool(
+        name="create_issue",
+        description="Create a new issue in a repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner username"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Issue title"
+                },
+                "body": {
+                    "type": "string",
+                    "description": "Issue body/description"
+                },
+                "labels": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Array of label names"
+                }
+            },
+            "required": ["owner", "repo", "title"]
+        }
+    ),
+    Tool(
+        name="search_repositories",
+        description="Search for repositories on GitHub",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query (e.g., 'language:python stars:>1000')"
+                },
+                "sort": {
+                    "type": "string",
+                    "enum": ["stars", "forks", "updated"],
+                    "description": "Sort field (default: best match)"
+                },
+                "per_page": {
+                    "type": "number",
+                    "description": "Results per page (max 100, default 30)"
+                }
+            },
+            "required": ["query"]
+        }
+    )
+]
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available GitHub tools"""
-    return [
-        Tool(
-            name="get_username",
-            description="Get the authenticated user's GitHub username and profile information",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": []
-            }
-        ),
-        Tool(
-            name="get_repos_list",
-            description="Get list of repositories for the authenticated user or a specific user",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "username": {
-                        "type": "string",
-                        "description": "GitHub username (optional, defaults to authenticated user)"
-                    },
-                    "type": {
-                        "type": "string",
-                        "enum": ["all", "owner", "member"],
-                        "description": "Type of repositories to list (default: owner)"
-                    },
-                    "sort": {
-                        "type": "string",
-                        "enum": ["created", "updated", "pushed", "full_name"],
-                        "description": "Sort order (default: updated)"
-                    }
-                },
-                "required": []
-            }
-        ),
-        Tool(
-            name="get_specific_repo",
-            description="Get detailed information about a specific repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    }
-                },
-                "required": ["owner", "repo"]
-            }
-        ),
-        Tool(
-            name="get_commits",
-            description="Get commit history for a repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "sha": {
-                        "type": "string",
-                        "description": "Branch name or commit SHA (optional)"
-                    },
-                    "per_page": {
-                        "type": "number",
-                        "description": "Number of commits to return (max 100, default 30)"
-                    }
-                },
-                "required": ["owner", "repo"]
-            }
-        ),
-        Tool(
-            name="get_specific_commit",
-            description="Get details of a specific commit",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "sha": {
-                        "type": "string",
-                        "description": "Commit SHA"
-                    }
-                },
-                "required": ["owner", "repo", "sha"]
-            }
-        ),
-        Tool(
-            name="get_pull_requests",
-            description="Get list of pull requests for a repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "state": {
-                        "type": "string",
-                        "enum": ["open", "closed", "all"],
-                        "description": "PR state (default: open)"
-                    },
-                    "sort": {
-                        "type": "string",
-                        "enum": ["created", "updated", "popularity", "long-running"],
-                        "description": "Sort order (default: created)"
-                    }
-                },
-                "required": ["owner", "repo"]
-            }
-        ),
-        Tool(
-            name="get_specific_pr",
-            description="Get details of a specific pull request",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "pr_number": {
-                        "type": "number",
-                        "description": "Pull request number"
-                    }
-                },
-                "required": ["owner", "repo", "pr_number"]
-            }
-        ),
-        Tool(
-            name="get_issues",
-            description="Get list of issues for a repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "state": {
-                        "type": "string",
-                        "enum": ["open", "closed", "all"],
-                        "description": "Issue state (default: open)"
-                    },
-                    "labels": {
-                        "type": "string",
-                        "description": "Comma-separated list of label names"
-                    }
-                },
-                "required": ["owner", "repo"]
-            }
-        ),
-        Tool(
-            name="get_branches",
-            description="Get list of branches for a repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    }
-                },
-                "required": ["owner", "repo"]
-            }
-        ),
-        Tool(
-            name="get_file_contents",
-            description="Get contents of a file from a repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "path": {
-                        "type": "string",
-                        "description": "File path in the repository"
-                    },
-                    "ref": {
-                        "type": "string",
-                        "description": "Branch name, tag, or commit SHA (optional)"
-                    }
-                },
-                "required": ["owner", "repo", "path"]
-            }
-        ),
-        Tool(
-            name="create_issue",
-            description="Create a new issue in a repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner username"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "title": {
-                        "type": "string",
-                        "description": "Issue title"
-                    },
-                    "body": {
-                        "type": "string",
-                        "description": "Issue body/description"
-                    },
-                    "labels": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Array of label names"
-                    }
-                },
-                "required": ["owner", "repo", "title"]
-            }
-        ),
-         Tool(
-            name="search_repositories",
-            description="Search for repositories on GitHub",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query (e.g., 'language:python stars:>1000')"
-                    },
-                    "sort": {
-                        "type": "string",
-                        "enum": ["stars", "forks", "updated"],
-                        "description": "Sort field (default: best match)"
-                    },
-                    "per_page": {
-                        "type": "number",
-                        "description": "Results per page (max 100, default 30)"
-                    }
-                },
-                "required": ["query"]
-            }
+    return _TOOLS
+
+
+async def _h_get_username(arguments: dict) -> Any:
+    """Get the authenticated user's GitHub username and profile information"""
+    data = await github_api_request("/user")
+    return {
+        "login": data.get("login"),
+        "name": data.get("name"),
+        "email": data.get("email"),
+        "bio": data.get("bio"),
+        "public_repos": data.get("public_repos"),
+        "followers": data.get("followers"),
+        "following": data.get("following"),
+        "created_at": data.get("created_at"),
+        "avatar_url": data.get("avatar_url")
+    }
+
+
+async def _h_get_repos_list(arguments: dict) -> Any:
+    """Get list of repositories for the authenticated user or a specific user"""
+    username = arguments.get("username")
+    repo_type = arguments.get("type", "owner")
+    sort = arguments.get("sort", "updated")
+
+    if username:
+        endpoint = f"/users/{quote(username, safe='')}/repos"
+        params = {"sort": sort}
+    else:
+        endpoint = "/user/repos"
+        params = {"type": repo_type, "sort": sort}
+
+    data = await _fetch_list(endpoint, params, arguments)
+    return [RepoSummary(
+        name=repo["name"],
+        full_name=repo["full_name"],
+        description=repo.get("description"),
+        private=repo["private"],
+        html_url=repo["html_url"],
+        language=repo.get("language"),
+        stargazers_count=repo["stargazers_count"],
+        forks_count=repo["forks_count"],
+        updated_at=repo["updated_at"]
+    ) for repo in data]
+
+
+async def _h_get_specific_repo(arguments: dict) -> Any:
+    """Get detailed information about a specific repository"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+    data = await github_api_request(_repo_path(owner, repo))
+    return {
+        "name": data["name"],
+        "full_name": data["full_name"],
+        "description": data.get("description"),
+        "private": data["private"],
+        "html_url": data["html_url"],
+        "language": data.get("language"),
+        "stargazers_count": data["stargazers_count"],
+        "forks_count": data["forks_count"],
+        "open_issues_count": data["open_issues_count"],
+        "default_branch": data["default_branch"],
+        "created_at": data["created_at"],
+        "updated_at": data["updated_at"],
+        "size": data["size"],
+        "topics": data.get("topics", [])
+    }
+
+
+async def _h_get_commits(arguments: dict) -> Any:
+    """Get commit history for a repository"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+    sha = arguments.get("sha", "")
+    # Left unset when the caller gave no size: GitHub's default of 30 applies to a
+    # single page, and pagination uses 100 per page
+    per_page = arguments.get("per_page")
+
+    data = await _fetch_list(
+        f"{_repo_path(owner, repo)}/commits",
+        {"per_page": per_page, "sha": sha},
+        arguments,
+    )
+    return [CommitSummary(
+        sha=commit["sha"],
+        message=commit["commit"]["message"],
+        author=commit["commit"]["author"]["name"],
+        date=commit["commit"]["author"]["date"],
+        url=commit["html_url"]
+    ) for commit in data]
+
+
+async def _h_get_specific_commit(arguments: dict) -> Any:
+    """Get details of a specific commit"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+    sha = arguments["sha"]
+
+    data = await github_api_request(
+        f"{_repo_path(owner, repo)}/commits/{quote(sha, safe='')}"
+    )
+    return {
+        "sha": data["sha"],
+        "message": data["commit"]["message"],
+        "author": data["commit"]["author"]["name"],
+        "date": data["commit"]["author"]["date"],
+        "url": data["html_url"],
+        "stats": data.get("stats"),
+        "files": [{
+            "filename": f["filename"],
+            "status": f["status"],
+            "additions": f["additions"],
+            "deletions": f["deletions"],
+            "changes": f["changes"]
+        } for f in data.get("files", [])]
+    }
+
+
+async def _h_get_pull_requests(arguments: dict) -> Any:
+    """Get list of pull requests for a repository"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+    state = arguments.get("state", "open")
+    sort = arguments.get("sort", "created")
+
+    data = await _fetch_list(
+        f"{_repo_path(owner, repo)}/pulls",
+        {"state": state, "sort": sort},
+        arguments,
+    )
+    return [{
+        "number": pr["number"],
+        "title": pr["title"],
+        "state": pr["state"],
+        "user": pr["user"]["login"],
+        "created_at": pr["created_at"],
+        "updated_at": pr["updated_at"],
+        "html_url": pr["html_url"],
+        "head": pr["head"]["ref"],
+        "base": pr["base"]["ref"]
+    } for pr in data]
+
+
+async def _h_get_specific_pr(arguments: dict) -> Any:
+    """Get details of a specific pull request"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+    pr_number = arguments["pr_number"]
+
+    data = await github_api_request(
+        f"{_repo_path(owner, repo)}/pulls/{int(pr_number)}"
+    )
+    return {
+        "number": data["number"],
+        "title": data["title"],
+        "body": data.get("body"),
+        "state": data["state"],
+        "user": data["user"]["login"],
+        "created_at": data["created_at"],
+        "updated_at": data["updated_at"],
+        "merged": data.get("merged", False),
+        "mergeable": data.get("mergeable"),
+        "html_url": data["html_url"],
+        "head": data["head"]["ref"],
+        "base": data["base"]["ref"],
+        "commits": data["commits"],
+        "additions": data["additions"],
+        "deletions": data["deletions"],
+        "changed_files": data["changed_files"]
+    }
+
+
+async def _h_get_issues(arguments: dict) -> Any:
+    """Get list of issues for a repository"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+    state = arguments.get("state", "open")
+    labels = arguments.get("labels", "")
+
+    if labels or state == "all":
+        # The search API can exclude pull requests server-side, but it
+        # has a much lower rate limit, so only use it for the broad queries
+        data = await _fetch_list(
+            "/search/issues",
+            {"q": _issue_search_query(owner, repo, state, labels)},
+            arguments,
+            key="items",
+        )
+    else:
+        data = await _fetch_list(
+            f"{_repo_path(owner, repo)}/issues",
+            {"state": state},
+            arguments,
         )
-     ]
+    return [{
+        "number": issue["number"],
+        "title": issue["title"],
+        "state": issue["state"],
+        "user": issue["user"]["login"],
+        "labels": [label["name"] for label in issue.get("labels", [])],
+        "created_at": issue["created_at"],
+        "updated_at": issue["updated_at"],
+        "html_url": issue["html_url"]
+    } for issue in data if "pull_request" not in issue]
+
+
+async def _h_get_branches(arguments: dict) -> Any:
+    """Get list of branches for a repository"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+
+    data = await github_api_request(f"{_repo_path(owner, repo)}/branches")
+    return [{
+        "name": branch["name"],
+        "protected": branch.get("protected", False),
+        "commit_sha": branch["commit"]["sha"]
+    } for branch in data]
+
+
+async def _h_get_file_contents(arguments: dict) -> Any:
+    """Get contents of a file from a repository"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+    path = arguments["path"]
+    ref = arguments.get("ref", "")
+
+    data = await github_api_request(
+        f"{_repo_path(owner, repo)}/contents/{quote(path)}",
+        params={"ref": ref},
+    )
+
+    # Decode base64 content if it's a file
+    if data.get("content"):
+        content = a2b_base64(data["content"]).decode("utf-8", errors="replace")
+    else:
+        content = None
+
+    return {
+        "name": data["name"],
+        "path": data["path"],
+        "sha": data["sha"],
+        "size": data["size"],
+        "type": data["type"],
+        "content": content,
+        "html_url": data["html_url"]
+    }
+
+
+async def _h_create_issue(arguments: dict) -> Any:
+    """Create a new issue in a repository"""
+    owner = arguments["owner"]
+    repo = arguments["repo"]
+    title = arguments["title"]
+    body = arguments.get("body", "")
+    labels = arguments.get("labels", [])
+
+    payload = {
+        "title": title,
+        "body": body,
+        "labels": labels
+    }
+
+    data = await github_api_request(
+        f"{_repo_path(owner, repo)}/issues",
+        method="POST",
+        data=payload
+    )
+    return {
+        "number": data["number"],
+        "title": data["title"],
+        "state": data["state"],
+        "html_url": data["html_url"],
+        "created_at": data["created_at"]
+    }
+
+
+async def _h_search_repositories(arguments: dict) -> Any:
+    """Search for repositories on GitHub"""
+    query = arguments["query"]
+    sort = arguments.get("sort", "")
+    per_page = arguments.get("per_page", 30)
+
+    data = await github_api_request(
+        "/search/repositories",
+        params={"q": query, "per_page": per_page, "sort": sort},
+    )
+    return {
+        "total_count": data["total_count"],
+        "items": [{
+            "name": repo["name"],
+            "full_name": repo["full_name"],
+            "description": repo.get("description"),
+            "html_url": repo["html_url"],
+            "language": repo.get("language"),
+            "stargazers_count": repo["stargazers_count"],
+            "forks_count": repo["forks_count"]
+        } for repo in data["items"]]
+    }
+
+
+_HANDLERS = {
+    "get_username": _h_get_username,
+    "get_repos_list": _h_get_repos_list,
+    "get_specific_repo": _h_get_specific_repo,
+    "get_commits": _h_get_commits,
+    "get_specific_commit": _h_get_specific_commit,
+    "get_pull_requests": _h_get_pull_requests,
+    "get_specific_pr": _h_get_specific_pr,
+    "get_issues": _h_get_issues,
+    "get_branches": _h_get_branches,
+    "get_file_contents": _h_get_file_contents,
+    "create_issue": _h_create_issue,
+    "search_repositories": _h_search_repositories,
+}
 
 
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """Handle tool calls"""
-    
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
+
     try:
-        if name == "get_username":
-            data = await github_api_request("/user")
-            result = {
-                "login": data.get("login"),
-                "name": data.get("name"),
-                "email": data.get("email"),
-                "bio": data.get("bio"),
-                "public_repos": data.get("public_repos"),
-                "followers": data.get("followers"),
-                "following": data.get("following"),
-                "created_at": data.get("created_at"),
-                "avatar_url": data.get("avatar_url")
-            }
-            
-        elif name == "get_repos_list":
-            username = arguments.get("username")
-            repo_type = arguments.get("type", "owner")
-            sort = arguments.get("sort", "updated")
-            
-            if username:
-                endpoint = f"/users/{username}/repos?sort={sort}"
-            else:
-                endpoint = f"/user/repos?type={repo_type}&sort={sort}"
-            
-            data = await github_api_request(endpoint)
-            result = [{
-                "name": repo["name"],
-                "full_name": repo["full_name"],
-                "description": repo.get("description"),
-                "private": repo["private"],
-                "html_url": repo["html_url"],
-                "language": repo.get("language"),
-                "stargazers_count": repo["stargazers_count"],
-                "forks_count": repo["forks_count"],
-                "updated_at": repo["updated_at"]
-            } for repo in data]
-            
-        elif name == "get_specific_repo":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            data = await github_api_request(f"/repos/{owner}/{repo}")
-            result = {
-                "name": data["name"],
-                "full_name": data["full_name"],
-                "description": data.get("description"),
-                "private": data["private"],
-                "html_url": data["html_url"],
-                "language": data.get("language"),
-                "stargazers_count": data["stargazers_count"],
-                "forks_count": data["forks_count"],
-                "open_issues_count": data["open_issues_count"],
-                "default_branch": data["default_branch"],
-                "created_at": data["created_at"],
-                "updated_at": data["updated_at"],
-                "size": data["size"],
-                "topics": data.get("topics", [])
-            }
-            
-        elif name == "get_commits":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            sha = arguments.get("sha", "")
-            per_page = arguments.get("per_page", 30)
-            
-            endpoint = f"/repos/{owner}/{repo}/commits?per_page={per_page}"
-            if sha:
-                endpoint += f"&sha={sha}"
-            
-            data = await github_api_request(endpoint)
-            result = [{
-                "sha": commit["sha"],
-                "message": commit["commit"]["message"],
-                "author": commit["commit"]["author"]["name"],
-                "date": commit["commit"]["author"]["date"],
-                "url": commit["html_url"]
-            } for commit in data]
-            
-        elif name == "get_specific_commit":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            sha = arguments["sha"]
-            
-            data = await github_api_request(f"/repos/{owner}/{repo}/commits/{sha}")
-            result = {
-                "sha": data["sha"],
-                "message": data["commit"]["message"],
-                "author": data["commit"]["author"]["name"],
-                "date": data["commit"]["author"]["date"],
-                "url": data["html_url"],
-                "stats": data.get("stats"),
-                "files": [{
-                    "filename": f["filename"],
-                    "status": f["status"],
-                    "additions": f["additions"],
-                    "deletions": f["deletions"],
-                    "changes": f["changes"]
-                } for f in data.get("files", [])]
-            }
-            
-        elif name == "get_pull_requests":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            state = arguments.get("state", "open")
-            sort = arguments.get("sort", "created")
-            
-            data = await github_api_request(
-                f"/repos/{owner}/{repo}/pulls?state={state}&sort={sort}"
-            )
-            result = [{
-                "number": pr["number"],
-                "title": pr["title"],
-                "state": pr["state"],
-                "user": pr["user"]["login"],
-                "created_at": pr["created_at"],
-                "updated_at": pr["updated_at"],
-                "html_url": pr["html_url"],
-                "head": pr["head"]["ref"],
-                "base": pr["base"]["ref"]
-            } for pr in data]
-            
-        elif name == "get_specific_pr":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            pr_number = arguments["pr_number"]
-            
-            data = await github_api_request(f"/repos/{owner}/{repo}/pulls/{pr_number}")
-            result = {
-                "number": data["number"],
-                "title": data["title"],
-                "body": data.get("body"),
-                "state": data["state"],
-                "user": data["user"]["login"],
-                "created_at": data["created_at"],
-                "updated_at": data["updated_at"],
-                "merged": data.get("merged", False),
-                "mergeable": data.get("mergeable"),
-                "html_url": data["html_url"],
-                "head": data["head"]["ref"],
-                "base": data["base"]["ref"],
-                "commits": data["commits"],
-                "additions": data["additions"],
-                "deletions": data["deletions"],
-                "changed_files": data["changed_files"]
-            }
-            
-        elif name == "get_issues":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            state = arguments.get("state", "open")
-            labels = arguments.get("labels", "")
-            
-            endpoint = f"/repos/{owner}/{repo}/issues?state={state}"
-            if labels:
-                endpoint += f"&labels={labels}"
-            
-            data = await github_api_request(endpoint)
-            result = [{
-                "number": issue["number"],
-                "title": issue["title"],
-                "state": issue["state"],
-                "user": issue["user"]["login"],
-                "labels": [label["name"] for label in issue.get("labels", [])],
-                "created_at": issue["created_at"],
-                "updated_at": issue["updated_at"],
-                "html_url": issue["html_url"]
-            } for issue in data if "pull_request" not in issue]
-            
-        elif name == "get_branches":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            
-            data = await github_api_request(f"/repos/{owner}/{repo}/branches")
-            result = [{
-                "name": branch["name"],
-                "protected": branch.get("protected", False),
-                "commit_sha": branch["commit"]["sha"]
-            } for branch in data]
-            
-        elif name == "get_file_contents":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            path = arguments["path"]
-            ref = arguments.get("ref", "")
-            
-            endpoint = f"/repos/{owner}/{repo}/contents/{path}"
-            if ref:
-                endpoint += f"?ref={ref}"
-            
-            data = await github_api_request(endpoint)
-            
-            # Decode base64 content if it's a file
-            import base64
-            if data.get("content"):
-                content = base64.b64decode(data["content"]).decode("utf-8")
-            else:
-                content = None
-            
-            result = {
-                "name": data["name"],
-                "path": data["path"],
-                "sha": data["sha"],
-                "size": data["size"],
-                "type": data["type"],
-                "content": content,
-                "html_url": data["html_url"]
-            }
-            
-        elif name == "create_issue":
-            owner = arguments["owner"]
-            repo = arguments["repo"]
-            title = arguments["title"]
-            body = arguments.get("body", "")
-            labels = arguments.get("labels", [])
-            
-            payload = {
-                "title": title,
-                "body": body,
-                "labels": labels
-            }
-            
-            data = await github_api_request(
-                f"/repos/{owner}/{repo}/issues",
-                method="POST",
-                data=payload
-            )
-            result = {
-                "number": data["number"],
-                "title": data["title"],
-                "state": data["state"],
-                "html_url": data["html_url"],
-                "created_at": data["created_at"]
-            }
-            
-        elif name == "search_repositories":
-            query = arguments["query"]
-            sort = arguments.get("sort", "")
-            per_page = arguments.get("per_page", 30)
-            
-            endpoint = f"/search/repositories?q={query}&per_page={per_page}"
-            if sort:
-                endpoint += f"&sort={sort}"
-            
-            data = await github_api_request(endpoint)
-            result = {
-                "total_count": data["total_count"],
-                "items": [{
-                    "name": repo["name"],
-                    "full_name": repo["full_name"],
-                    "description": repo.get("description"),
-                    "html_url": repo["html_url"],
-                    "language": repo.get("language"),
-                    "stargazers_count": repo["stargazers_count"],
-                    "forks_count": repo["forks_count"]
-                } for repo in data["items"]]
-            }
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
-        
+        result = await handler(arguments)
         return [TextContent(
             type="text",
-            text=json.dumps(result, indent=2)
+            text=_dump(result)
         )]
         
     except httpx.HTTPStatusError as e:
@@ -621,13 +976,23 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
 async def main():
     """Run the MCP server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        await aclose()
 
 
 if __name__ == "__main__":
+    # uvloop is optional and POSIX-only; fall back to the default loop otherwise
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
     asyncio.run(main())
\ No newline at end of file
@@ -1,39 +1,581 @@
 import asyncio
+import codecs
+import functools
 import json
 import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 import io
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+import httplib2
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaInMemoryUpload, MediaIoBaseDownload, set_user_agent
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configuration
 SCOPES = ["https://www.googleapis.com/auth/drive"]
-TOKEN_PATH = Path("D:\\AI_agents\\hoodie\\drive_token.json")
-CREDENTIALS_PATH = Path("D:\\AI_agents\\hoodie\\drive_credential.json")
+CONFIG_DIR = Path.home() / ".hoodie"
+TOKEN_PATH = Path(os.environ.get("HOODIE_DRIVE_TOKEN", str(CONFIG_DIR / "drive_token.json")))
+CREDENTIALS_PATH = Path(os.environ.get("HOODIE_DRIVE_CREDENTIALS", str(CONFIG_DIR / "drive_credential.json")))
+# The local metadata index crawls the whole Drive, so it is opt-in
+INDEX_ENABLED = os.environ.get("HOODIE_DRIVE_INDEX_ENABLED") == "1"
+INDEX_PATH = Path(os.environ.get("HOODIE_DRIVE_INDEX", str(CONFIG_DIR / "drive_index.db")))
+# Seconds between polls of the Drive changes feed that keeps the local index current
+INDEX_POLL_INTERVAL = 60
+INDEX_FIELDS = "id, name, mimeType, parents, modifiedTime"
+# Refresh the access token this many seconds before it expires
+REFRESH_MARGIN = 300
+# googleapiclient appends "(gzip)" to this on JSON API calls, which together with
+# its Accept-Encoding header is what makes Google compress responses
+USER_AGENT = "hoodie-mcp/1.0"
+
+# Drive rejects batch requests with more than 100 calls
+BATCH_LIMIT = 100
+# Concurrent Drive requests per server; Drive throttles users at roughly 10 writes/s
+MAX_CONCURRENT_REQUESTS = 10
+# Transient failures are retried with exponential backoff, honoring Retry-After
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Drive reports per-user quota exhaustion as 403 with one of these reasons
+RATE_LIMIT_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded"})
+MAX_ATTEMPTS = 6
+MAX_RETRY_DELAY = 60.0
+# Seconds a files.list result is served from memory
+LIST_CACHE_TTL = 60.0
+# File fields returned by list_files and search_files unless the caller narrows them
+LIST_FIELDS = ("id", "name", "mimeType", "size", "modifiedTime", "createdTime")
+DEFAULT_MAX_RESULTS = 100
+# Largest pageSize files.list accepts
+MAX_PAGE_SIZE = 1000
+# Bytes fetched per media download request
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Uploads below this size go in a single multipart request; larger ones are
+# resumable so a dropped connection doesn't restart them
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Read-only tools whose identical concurrent calls share one in-flight request
+SINGLE_FLIGHT_TOOLS = frozenset({"list_files", "search_files", "read_file", "read_files"})
+# Tools that change Drive contents and so invalidate cached listings
+MUTATING_TOOLS = frozenset({
+    "write_file", "update_file", "delete_file", "delete_files", "create_folder", "batch_file_ops",
+})
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+
+def _folder_body(args: dict) -> dict:
+    """Metadata for a new folder from tool arguments."""
+    body = {"name": args["name"], "mimeType": FOLDER_MIME_TYPE}
+    if "parent_id" in args:
+        body["parents"] = [args["parent_id"]]
+    return body
+
+
+# Metadata-only operations accepted by batch_file_ops. Media uploads and
+# downloads cannot be batched.
+BATCH_OPS = {
+    "delete": lambda files, args: files.delete(fileId=args["file_id"]),
+    "create_folder": lambda files, args: files.create(body=_folder_body(args), fields="id, name"),
+    "rename": lambda files, args: files.update(
+        fileId=args["file_id"], body={"name": args["name"]}, fields="id, name"
+    ),
+}
+
+
+def _dump(obj: Any) -> str:
+    """Serialize a tool result as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+@functools.lru_cache(maxsize=None)
+def _drive_discovery() -> dict:
+    """Drive v3 discovery document bundled with googleapiclient, parsed once per process.
+
+    Only the static copy is used, so building the service never fetches the
+    document over the network.
+    """
+    document = discovery_cache.get_static_doc("drive", "v3")
+    if document is None:
+        raise RuntimeError(
+            "Drive discovery document not found; google-api-python-client 2.x is required"
+        )
+    return json.loads(document)
+
+
+@functools.lru_cache(maxsize=1)
+def _client_config() -> dict:
+    """OAuth2 client secrets, read and parsed once per process."""
+    if not CREDENTIALS_PATH.exists():
+        raise Exception(
+            f"Credentials file not found at {CREDENTIALS_PATH}. "
+            "Please download OAuth2 credentials from Google Cloud Console."
+        )
+    return json.loads(CREDENTIALS_PATH.read_text())
+
+
+def _make_flow() -> InstalledAppFlow:
+    """OAuth2 flow for the client secrets, using the out-of-band redirect for CLI applications."""
+    flow = InstalledAppFlow.from_client_config(_client_config(), SCOPES)
+    flow.redirect_uri = "urn:ietf:wg:oauth:2.0:oob"
+    return flow
+
+
+def _retry_delay(error: HttpError, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying a failed request, or None if it should not be retried."""
+    status = error.resp.status
+    details = error.error_details if isinstance(error.error_details, list) else []
+    rate_limited = status == 403 and any(
+        isinstance(detail, dict) and detail.get("reason") in RATE_LIMIT_REASONS for detail in details
+    )
+    if (status not in RETRY_STATUSES and not rate_limited) or attempt >= MAX_ATTEMPTS - 1:
+        return None
+
+    try:
+        return min(float(error.resp.get("retry-after")), MAX_RETRY_DELAY)
+    except (TypeError, ValueError):
+        return min(MAX_RETRY_DELAY, 0.5 * 2 ** attempt) + random.random()
+
+
+def _write_token(creds: Credentials) -> None:
+    """Persist the OAuth2 token, creating its directory on first use."""
+    TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    TOKEN_PATH.write_text(creds.to_json())
+
+
+def _build_service(creds: Credentials):
+    """Drive v3 service for the given credentials, without re-reading the discovery document."""
+    return build_from_document(_drive_discovery(), credentials=creds)
+
+
+def _upload_media(content: str, mimetype: str) -> MediaInMemoryUpload:
+    """Upload body for text content, multipart when small and resumable when large.
+
+    The encoded bytes are the only copy: MediaInMemoryUpload reads from them
+    directly, for both the single-request and the chunked path.
+    """
+    data = content.encode("utf-8")
+    return MediaInMemoryUpload(
+        data,
+        mimetype=mimetype,
+        chunksize=UPLOAD_CHUNK_SIZE,
+        resumable=len(data) >= RESUMABLE_THRESHOLD,
+    )
+
+
+class _TextSink(io.RawIOBase):
+    """Writable file that decodes UTF-8 as chunks arrive instead of buffering raw bytes."""
+
+    def __init__(self):
+        super().__init__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._parts: list[str] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(self._decoder.decode(b))
+        return len(b)
+
+    def getvalue(self) -> str:
+        self._parts.append(self._decoder.decode(b"", final=True))
+        return "".join(self._parts)
+
+
+class DriveIndex:
+    """Local SQLite copy of Drive file metadata (non-trashed files only).
+
+    Built from one paginated files.list and kept current from the changes feed.
+    Methods are blocking and safe to call from worker threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create its tables on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    mime_type TEXT,
+                    parents TEXT,
+                    modified_time TEXT
+                );
+                CREATE INDEX IF NOT EXISTS files_name ON files (name);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def page_token(self) -> Optional[str]:
+        """Changes-feed token the index is current up to, or None if it was never built."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM meta WHERE key = 'page_token'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply(self, upserts: list[dict], removed: list[str], page_token: Optional[str] = None,
+              reset: bool = False) -> None:
+        """Apply one batch of changes atomically, optionally advancing the stored token."""
+        rows = [
+            (f["id"], f["name"], f.get("mimeType"), json.dumps(f.get("parents", [])), f.get("modifiedTime"))
+            for f in upserts
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if reset:
+                    conn.execute("DELETE FROM files")
+                conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+                conn.executemany("DELETE FROM files WHERE id = ?", [(file_id,) for file_id in removed])
+                if page_token is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta VALUES ('page_token', ?)", (page_token,)
+                    )
+
+    def search(self, name_contains: Optional[str], mime_type: Optional[str], limit: int) -> list[dict]:
+        """Files whose name contains a substring (case-insensitive) and/or have a MIME type."""
+        clauses, params = [], []
+        if name_contains:
+            escaped = name_contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if mime_type:
+            clauses.append("mime_type = ?")
+            params.append(mime_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT id, name, mime_type, parents, modified_time FROM files {where} "
+                "ORDER BY modified_time DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [
+            {"id": id_, "name": name, "mimeType": mime, "parents": json.loads(parents), "modifiedTime": modified}
+            for id_, name, mime, parents, modified in rows
+        ]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Schema fragments shared by several tools
+_NO_ARGUMENTS_SCHEMA = {"type": "object", "properties": {}}
+_FILE_ID_PROPERTY = {
+    "type": "string",
+    "description": "Google Drive file ID",
+}
+_FILE_IDS_PROPERTY = {
+    "type": "array",
+    "items": {"type": "string"},
+    "description": "Google Drive file IDs",
+}
+_LIST_PROPERTIES = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": f"File fields to return (default: {', '.join(LIST_FIELDS)})",
+    },
+    "max_results": {
+        "type": "number",
+        "description": f"Maximum number of files to return, fetched across pages (default: {DEFAULT_MAX_RESULTS})",
+    },
+}
+
+# Tool definitions are static, so they are built once rather than per list_tools request
+_TOOLS: list[Tool] = [
+    Tool(
+        name="get_auth_url",
+        description="Get OAuth2 authorization URL for Google Drive access",
+        inputSchema=_NO_ARGUMENTS_SCHEMA,
+    ),
+    Tool(
+        name="save_auth_token",
+        description="Save OAuth2 authorization code after user grants access",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "code": {
+                    "type": "string",
+                    "description": "Authorization code from OAuth2 callback",
+                },
+            },
+            "required": ["code"],
+        },
+    ),
+    Tool(
+        name="list_files",
+        description="List files in Google Drive with optional search query",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query (e.g., \"name contains 'report'\")",
+                },
+                **_LIST_PROPERTIES,
+            },
+        },
+    ),
+    Tool(
+        name="read_file",
+        description="Read content of a file by its ID",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": _FILE_ID_PROPERTY,
+            },
+            "required": ["file_id"],
+        },
+    ),
+    Tool(
+        name="read_files",
+        description="Read the content of several files concurrently by their IDs",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_ids": _FILE_IDS_PROPERTY,
+            },
+            "required": ["file_ids"],
+        },
+    ),
+    Tool(
+        name="write_file",
+        description="Create a new file in Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "File name",
+                },
+                "content": {
+                    "type": "string",
+                    "description": "File content",
+                },
+                "mime_type": {
+                    "type": "string",
+                    "description": "MIME type (default: text/plain)",
+                },
+                "folder_id": {
+                    "type": "string",
+                    "description": "Parent folder ID (optional)",
+                },
+            },
+            "required": ["name", "content"],
+        },
+    ),
+    Tool(
+        name="update_file",
+        description="Update an existing file's content",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": _FILE_ID_PROPERTY,
+                "content": {
+                    "type": "string",
+                    "description": "New file content",
+                },
+            },
+            "required": ["file_id", "content"],
+        },
+    ),
+    Tool(
+        name="delete_file",
+        description="Delete a file by its ID",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": _FILE_ID_PROPERTY,
+            },
+            "required": ["file_id"],
+        },
+    ),
+    Tool(
+        name="delete_files",
+        description="Delete several files concurrently by their IDs",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_ids": _FILE_IDS_PROPERTY,
+            },
+            "required": ["file_ids"],
+        },
+    ),
+    Tool(
+        name="create_folder",
+        description="Create a new folder in Google Drive",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Folder name",
+                },
+                "parent_id": {
+                    "type": "string",
+                    "description": "Parent folder ID (optional)",
+                },
+            },
+            "required": ["name"],
+        },
+    ),
+    Tool(
+        name="batch_file_ops",
+        description=(
+            "Run many metadata operations (delete, create_folder, rename) "
+            "in a single Drive batch request"
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "operations": {
+                    "type": "array",
+                    "description": "Operations to run, in order",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "op": {
+                                "type": "string",
+                                "enum": list(BATCH_OPS),
+                                "description": "Operation name",
+                            },
+                            "args": {
+                                "type": "object",
+                                "description": (
+                                    "delete: {file_id}; create_folder: {name, parent_id?}; "
+                                    "rename: {file_id, name}"
+                                ),
+                            },
+                        },
+                        "required": ["op", "args"],
+                    },
+                },
+            },
+            "required": ["operations"],
+        },
+    ),
+    Tool(
+        name="test_credentials",
+        description="Test whether Google Drive credentials are valid",
+        inputSchema=_NO_ARGUMENTS_SCHEMA,
+    ),
+    Tool(
+        name="search_files",
+        description="Search for files using Google Drive query syntax",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Google Drive search query",
+                },
+                **_LIST_PROPERTIES,
+            },
+            "required": ["query"],
+        },
+    ),
+]
+
+# Only offered when the local index is enabled
+_LOCAL_SEARCH_TOOL = Tool(
+    name="local_search",
+    description=(
+        "Search a local index of Drive file metadata by name and/or MIME type. "
+        "Much faster than search_files, but may lag Drive by about a minute and "
+        "excludes trashed files"
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "name_contains": {
+                "type": "string",
+                "description": "Case-insensitive substring of the file name",
+            },
+            "mime_type": {
+                "type": "string",
+                "description": "Exact MIME type (e.g., application/vnd.google-apps.folder)",
+            },
+            "max_results": {
+                "type": "number",
+                "description": f"Maximum number of files to return (default: {DEFAULT_MAX_RESULTS})",
+            },
+        },
+    },
+)
+if INDEX_ENABLED:
+    _TOOLS.append(_LOCAL_SEARCH_TOOL)
+
+# save_auth_token acknowledgement, which never varies
+_AUTH_SAVED = [
+    TextContent(
+        type="text",
+        text="Authorization successful! You can now use Google Drive tools.",
+    )
+]
 
 
 class GoogleDriveMCPServer:
     def __init__(self):
         self.server = Server("google-drive-mcp")
         self.creds: Optional[Credentials] = None
+        # Flow that issued the last auth URL; the code exchange must use the same one
+        self._flow: Optional[InstalledAppFlow] = None
         self.service = None
+        self._local = threading.local()
+        self._sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._creds_lock = asyncio.Lock()
+        self._list_cache: dict[tuple, tuple[float, list]] = {}
+        # Bumped by every mutating call; a list that started before the bump
+        # may hold stale results and must not cache them
+        self._list_generation = 0
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._index = DriveIndex(INDEX_PATH) if INDEX_ENABLED else None
         self.setup_handlers()
 
     def load_credentials(self) -> None:
-        """Load OAuth2 credentials and create Drive service."""
-        creds = None
+        """Load OAuth2 credentials and create Drive service, refreshing the token if it expired."""
+        if self.service is not None and self.creds.valid:
+            return
+
+        # Refresh in place when already loaded so per-thread transports stay valid
+        creds = self.creds
         
         # Load token if it exists
-        if TOKEN_PATH.exists():
+        if creds is None and TOKEN_PATH.exists():
             creds = Credentials.from_authorized_user_file(str(TOKEN_PATH), SCOPES)
         
         # If no valid credentials, raise error
@@ -41,7 +583,7 @@ class GoogleDriveMCPServer:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
                 # Save refreshed credentials
-                TOKEN_PATH.write_text(creds.to_json())
+                _write_token(creds)
             else:
                 raise Exception(
                     "No valid token found. Please run authentication first. "
@@ -49,21 +591,180 @@ class GoogleDriveMCPServer:
                 )
         
         self.creds = creds
-        self.service = build("drive", "v3", credentials=creds)
+        if self.service is None:
+            self.service = _build_service(creds)
+
+    async def _ensure_service(self) -> None:
+        """Load credentials on first use and refresh them once expired.
+
+        Token refresh and discovery run in a worker thread; the lock keeps
+        concurrent tool calls from refreshing the same token at once.
+        """
+        if self.service is not None and self.creds.valid:
+            return
+        async with self._creds_lock:
+            if self.service is not None and self.creds.valid:
+                return
+            await asyncio.to_thread(self.load_credentials)
+
+    async def _refresher(self) -> None:
+        """Refresh the access token shortly before it expires, off the tool-call path."""
+        while True:
+            creds = self.creds
+            if creds is None or creds.expiry is None:
+                # Not authenticated yet (or the token never expires); check again later
+                await asyncio.sleep(REFRESH_MARGIN)
+                continue
+
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            delay = (creds.expiry - now).total_seconds() - REFRESH_MARGIN
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            try:
+                async with self._creds_lock:
+                    await asyncio.to_thread(self._refresh_token)
+            except Exception:
+                # The next tool call retries through _ensure_service and reports the error
+                await asyncio.sleep(REFRESH_MARGIN)
+
+    def _refresh_token(self) -> None:
+        """Refresh the access token and persist it."""
+        self.creds.refresh(Request())
+        _write_token(self.creds)
+
+    def _authorized_http(self) -> AuthorizedHttp:
+        """Authorized HTTP transport for the calling thread, reused across requests."""
+        # httplib2.Http is not thread-safe, so each worker thread keeps its own
+        # keep-alive connection instead of sharing one
+        local = self._local
+        if getattr(local, "creds", None) is not self.creds:
+            local.creds = self.creds
+            http = set_user_agent(httplib2.Http(timeout=30), USER_AGENT)
+            local.http = AuthorizedHttp(self.creds, http=http)
+        return local.http
+
+    def _execute_sync(self, request) -> Any:
+        """Execute a Drive API request on the calling thread's connection."""
+        return request.execute(http=self._authorized_http())
+
+    async def _run_blocking(self, func: Callable[..., Any], *args) -> Any:
+        """Run a blocking Drive call in a worker thread, retrying transient HTTP errors."""
+        attempt = 0
+        while True:
+            try:
+                async with self._sem:
+                    return await asyncio.to_thread(func, *args)
+            except HttpError as error:
+                delay = _retry_delay(error, attempt)
+                if delay is None:
+                    raise
+            # Back off outside the semaphore so waiting doesn't hold a request slot
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _exec(self, request) -> Any:
+        """Execute a Drive API request in a worker thread so it doesn't block the event loop."""
+        return await self._run_blocking(self._execute_sync, request)
+
+    async def _single_flight(self, key: tuple, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory() unless an identical call is already in flight, then share its result."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _list_files(self, arguments: dict, query: Optional[str]) -> list:
+        """files.list following page tokens up to max_results, served from a
+        short-lived in-memory cache for repeated queries."""
+        fields = tuple(arguments.get("fields") or LIST_FIELDS)
+        max_results = int(arguments.get("max_results", DEFAULT_MAX_RESULTS))
+        key = (query, fields, max_results)
+        cached = self._list_cache.get(key)
+        if cached is not None:
+            if time.monotonic() - cached[0] < LIST_CACHE_TTL:
+                return cached[1]
+            del self._list_cache[key]
+
+        generation = self._list_generation
+        # Only the requested file fields are transferred
+        mask = f"nextPageToken, files({', '.join(fields)})"
+        files: list = []
+        page_token = None
+        while len(files) < max_results:
+            results = await self._exec(self.service.files().list(
+                q=query,
+                fields=mask,
+                pageSize=min(max_results - len(files), MAX_PAGE_SIZE),
+                pageToken=page_token,
+            ))
+            files.extend(results.get("files", []))
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+
+        if generation != self._list_generation:
+            return files
+        now = time.monotonic()
+        # Drop other expired queries too, so one-off queries don't accumulate
+        for stale in [k for k, (ts, _) in self._list_cache.items() if now - ts >= LIST_CACHE_TTL]:
+            del self._list_cache[stale]
+        self._list_cache[key] = (now, files)
+        return files
+
+    def _download_sync(self, file_id: str) -> str:
+        """Download a file's content on the calling thread's connection."""
+        request = self.service.files().get_media(fileId=file_id)
+        request.http = self._authorized_http()
+        sink = _TextSink()
+        downloader = MediaIoBaseDownload(sink, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+
+        return sink.getvalue()
+
+    async def _download(self, file_id: str) -> str:
+        """Download a file's content in a worker thread."""
+        return await self._run_blocking(self._download_sync, file_id)
+
+    async def _batch(self, ops: list[dict]) -> list[dict]:
+        """Run metadata operations as Drive batch requests, one HTTP round-trip per 100 ops."""
+        results: list[dict] = [{} for _ in ops]
+
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            entry = {"op": ops[index]["op"]}
+            if exception is not None:
+                entry["error"] = str(exception)
+            else:
+                entry["result"] = response or {}
+            results[index] = entry
+
+        files = self.service.files()
+        for start in range(0, len(ops), BATCH_LIMIT):
+            batch = self.service.new_batch_http_request(callback=callback)
+            queued = 0
+            for index in range(start, min(start + BATCH_LIMIT, len(ops))):
+                op = ops[index]
+                if op["op"] not in BATCH_OPS:
+                    results[index] = {"op": op["op"], "error": f"Unknown operation: {op['op']}"}
+                    continue
+                batch.add(BATCH_OPS[op["op"]](files, op.get("args", {})), request_id=str(index))
+                queued += 1
+            if queued:
+                await self._exec(batch)
+
+        return results
 
     def get_auth_url(self) -> str:
         """Generate OAuth2 authorization URL."""
-        if not CREDENTIALS_PATH.exists():
-            raise Exception(
-                f"Credentials file not found at {CREDENTIALS_PATH}. "
-                "Please download OAuth2 credentials from Google Cloud Console."
-            )
-        
-        flow = InstalledAppFlow.from_client_secrets_file(
-            str(CREDENTIALS_PATH), SCOPES
-        )
-        # Use the out-of-band flow for CLI applications
-        flow.redirect_uri = "urn:ietf:wg:oauth:2.0:oob"
+        flow = self._flow = _make_flow()
         
         auth_url, _ = flow.authorization_url(
             access_type="offline",
@@ -74,377 +775,351 @@ class GoogleDriveMCPServer:
 
     def save_token(self, code: str) -> None:
         """Save OAuth2 token from authorization code."""
-        if not CREDENTIALS_PATH.exists():
-            raise Exception(f"Credentials file not found at {CREDENTIALS_PATH}")
-        
-        flow = InstalledAppFlow.from_client_secrets_file(
-            str(CREDENTIALS_PATH), SCOPES
-        )
-        flow.redirect_uri = "urn:ietf:wg:oauth:2.0:oob"
+        flow = self._flow or _make_flow()
         
         flow.fetch_token(code=code)
         creds = flow.credentials
+        self._flow = None
         
         # Save credentials
-        TOKEN_PATH.write_text(creds.to_json())
+        _write_token(creds)
         
         self.creds = creds
-        self.service = build("drive", "v3", credentials=creds)
+        self.service = _build_service(creds)
 
     
     def setup_handlers(self):
         """Set up MCP request handlers."""
-        
+        self._handlers: dict[str, Callable[[dict], Awaitable[list[TextContent]]]] = {
+            "get_auth_url": self._tool_get_auth_url,
+            "save_auth_token": self._tool_save_auth_token,
+            "test_credentials": self._tool_test_credentials,
+            "list_files": self._tool_list_files,
+            "read_file": self._tool_read_file,
+            "read_files": self._tool_read_files,
+            "write_file": self._tool_write_file,
+            "update_file": self._tool_update_file,
+            "delete_file": self._tool_delete_file,
+            "delete_files": self._tool_delete_files,
+            "create_folder": self._tool_create_folder,
+            "batch_file_ops": self._tool_batch_file_ops,
+            "search_files": self._tool_search_files,
+        }
+        if INDEX_ENABLED:
+            self._handlers["local_search"] = self._tool_local_search
+
         @self.server.list_tools()
         async def list_tools() -> list[Tool]:
-            return [
-                Tool(
-                    name="get_auth_url",
-                    description="Get OAuth2 authorization URL for Google Drive access",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                    },
-                ),
-                Tool(
-                    name="save_auth_token",
-                    description="Save OAuth2 authorization code after user grants access",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "code": {
-                                "type": "string",
-                                "description": "Authorization code from OAuth2 callback",
-                            },
-                        },
-                        "required": ["code"],
-                    },
-                ),
-                Tool(
-                    name="list_files",
-                    description="List files in Google Drive with optional search query",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Search query (e.g., \"name contains 'report'\")",
-                            },
-                            "page_size": {
-                                "type": "number",
-                                "description": "Number of files to return (default: 100)",
-                            },
-                        },
-                    },
-                ),
-                Tool(
-                    name="read_file",
-                    description="Read content of a file by its ID",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "file_id": {
-                                "type": "string",
-                                "description": "Google Drive file ID",
-                            },
-                        },
-                        "required": ["file_id"],
-                    },
-                ),
-                Tool(
-                    name="write_file",
-                    description="Create a new file in Google Drive",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "name": {
-                                "type": "string",
-                                "description": "File name",
-                            },
-                            "content": {
-                                "type": "string",
-                                "description": "File content",
-                            },
-                            "mime_type": {
-                                "type": "string",
-                                "description": "MIME type (default: text/plain)",
-                            },
-                            "folder_id": {
-                                "type": "string",
-                                "description": "Parent folder ID (optional)",
-                            },
-                        },
-                        "required": ["name", "content"],
-                    },
-                ),
-                Tool(
-                    name="update_file",
-                    description="Update an existing file's content",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "file_id": {
-                                "type": "string",
-                                "description": "Google Drive file ID",
-                            },
-                            "content": {
-                                "type": "string",
-                                "description": "New file content",
-                            },
-                        },
-                        "required": ["file_id", "content"],
-                    },
-                ),
-                Tool(
-                    name="delete_file",
-                    description="Delete a file by its ID",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "file_id": {
-                                "type": "string",
-                                "description": "Google Drive file ID",
-                            },
-                        },
-                        "required": ["file_id"],
-                    },
-                ),
-                Tool(
-                    name="create_folder",
-                    description="Create a new folder in Google Drive",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "name": {
-                                "type": "string",
-                                "description": "Folder name",
-                            },
-                            "parent_id": {
-                                "type": "string",
-                                "description": "Parent folder ID (optional)",
-                            },
-                        },
-                        "required": ["name"],
-                    },
-                ),
-                Tool(
-                    name="test_credentials",
-                    description="Test whether Google Drive credentials are valid",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                    },
-                ),
-
-                Tool(
-                    name="search_files",
-                    description="Search for files using Google Drive query syntax",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Google Drive search query",
-                            },
-                        },
-                        "required": ["query"],
-                    },
-                ),
-            ]
+            return _TOOLS
 
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             try:
-                if name == "get_auth_url":
-                    url = self.get_auth_url()
-                    return [
-                        TextContent(
-                            type="text",
-                            text=f"Please visit this URL to authorize access:\n\n{url}\n\n"
-                            f"After authorizing, copy the code and use the 'save_auth_token' tool.",
-                        )
-                    ]
-
-                elif name == "save_auth_token":
-                    self.save_token(arguments["code"])
-                    return [
-                        TextContent(
-                            type="text",
-                            text="Authorization successful! You can now use Google Drive tools.",
-                        )
-                    ]
-                elif name == "test_credentials":
-                    info = self.test_credentials()
-                    return [
-                        TextContent(
-                            type="text",
-                            text=(
-                                "✅ Credentials are valid!\n\n"
-                                f"Email: {info['email']}\n"
-                                f"Name: {info['display_name']}\n"
-                                f"Storage Used: {info['usage']} / {info['limit']}"
-                            ),
-                        )
-                    ]
-
-                elif name == "list_files":
-                    if not self.service:
-                        self.load_credentials()
-                    
-                    results = self.service.files().list(
-                        pageSize=arguments.get("page_size", 100),
-                        fields="files(id, name, mimeType, size, modifiedTime, createdTime)",
-                        q=arguments.get("query"),
-                    ).execute()
-                    
-                    files = results.get("files", [])
-                    return [
-                        TextContent(
-                            type="text",
-                            text=json.dumps(files, indent=2),
-                        )
-                    ]
-
-                elif name == "read_file":
-                    if not self.service:
-                        self.load_credentials()
-                    
-                    request = self.service.files().get_media(fileId=arguments["file_id"])
-                    fh = io.BytesIO()
-                    downloader = MediaIoBaseDownload(fh, request)
-                    
-                    done = False
-                    while not done:
-                        _, done = downloader.next_chunk()
-                    
-                    content = fh.getvalue().decode("utf-8")
-                    return [TextContent(type="text", text=content)]
-
-                elif name == "write_file":
-                    if not self.service:
-                        self.load_credentials()
-                    
-                    file_metadata = {"name": arguments["name"]}
-                    
-                    if "folder_id" in arguments:
-                        file_metadata["parents"] = [arguments["folder_id"]]
-                    
-                    media = MediaIoBaseUpload(
-                        io.BytesIO(arguments["content"].encode("utf-8")),
-                        mimetype=arguments.get("mime_type", "text/plain"),
-                    )
-                    
-                    file = self.service.files().create(
-                        body=file_metadata,
-                        media_body=media,
-                        fields="id, name, mimeType",
-                    ).execute()
-                    
-                    return [
-                        TextContent(
-                            type="text",
-                            text=f"File created successfully:\n{json.dumps(file, indent=2)}",
-                        )
-                    ]
-
-                elif name == "update_file":
-                    if not self.service:
-                        self.load_credentials()
-                    
-                    media = MediaIoBaseUpload(
-                        io.BytesIO(arguments["content"].encode("utf-8")),
-                        mimetype="text/plain",
-                    )
-                    
-                    file = self.service.files().update(
-                        fileId=arguments["file_id"],
-                        media_body=media,
-                        fields="id, name, mimeType, modifiedTime",
-                    ).execute()
-                    
-                    return [
-                        TextContent(
-                            type="text",
-                            text=f"File updated successfully:\n{json.dumps(file, indent=2)}",
-                        )
-                    ]
-
-                elif name == "delete_file":
-                    if not self.service:
-                        self.load_credentials()
-                    
-                    self.service.files().delete(fileId=arguments["file_id"]).execute()
-                    
-                    return [
-                        TextContent(
-                            type="text",
-                            text=f"File {arguments['file_id']} deleted successfully.",
-                        )
-                    ]
-
-                elif name == "create_folder":
-                    if not self.service:
-                        self.load_credentials()
-                    
-                    file_metadata = {
-                        "name": arguments["name"],
-                        "mimeType": "application/vnd.google-apps.folder",
-                    }
-                    
-                    if "parent_id" in arguments:
-                        file_metadata["parents"] = [arguments["parent_id"]]
-                    
-                    folder = self.service.files().create(
-                        body=file_metadata,
-                        fields="id, name",
-                    ).execute()
-                    
-                    return [
-                        TextContent(
-                            type="text",
-                            text=f"Folder created successfully:\n{json.dumps(folder, indent=2)}",
-                        )
-                    ]
-
-                elif name == "search_files":
-                    if not self.service:
-                        self.load_credentials()
-                    
-                    results = self.service.files().list(
-                        q=arguments["query"],
-                        fields="files(id, name, mimeType, size, modifiedTime)",
-                    ).execute()
-                    
-                    files = results.get("files", [])
-                    return [
-                        TextContent(
-                            type="text",
-                            text=json.dumps(files, indent=2),
-                        )
-                    ]
-
-                else:
+                handler = self._handlers.get(name)
+                if handler is None:
                     raise ValueError(f"Unknown tool: {name}")
+                if name in SINGLE_FLIGHT_TOOLS:
+                    key = (name, json.dumps(arguments, sort_keys=True))
+                    return await self._single_flight(key, lambda: handler(arguments))
+                return await handler(arguments)
 
             except Exception as e:
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
 
+            finally:
+                # Cleared after the call, since even a failed one may have
+                # partly applied. Bumping the generation stops lists that were
+                # already running from caching what they fetched before this.
+                if name in MUTATING_TOOLS:
+                    self._list_generation += 1
+                    self._list_cache.clear()
+
+    async def _tool_get_auth_url(self, arguments: dict) -> list[TextContent]:
+        """Get OAuth2 authorization URL for Google Drive access."""
+        url = await asyncio.to_thread(self.get_auth_url)
+        return [
+            TextContent(
+                type="text",
+                text=f"Please visit this URL to authorize access:\n\n{url}\n\n"
+                f"After authorizing, copy the code and use the 'save_auth_token' tool.",
+            )
+        ]
+
+    async def _tool_save_auth_token(self, arguments: dict) -> list[TextContent]:
+        """Save OAuth2 authorization code after user grants access."""
+        await asyncio.to_thread(self.save_token, arguments["code"])
+        return _AUTH_SAVED
+
+    async def _tool_test_credentials(self, arguments: dict) -> list[TextContent]:
+        """Test whether Google Drive credentials are valid."""
+        info = await self.test_credentials()
+        return [
+            TextContent(
+                type="text",
+                text=(
+                    "✅ Credentials are valid!\n\n"
+                    f"Email: {info['email']}\n"
+                    f"Name: {info['display_name']}\n"
+                    f"Storage Used: {info['usage']} / {info['limit']}"
+                ),
+            )
+        ]
+
+    async def _tool_list_files(self, arguments: dict) -> list[TextContent]:
+        """List files in Google Drive with optional search query."""
+        await self._ensure_service()
+
+        files = await self._list_files(arguments, arguments.get("query"))
+        return [
+            TextContent(
+                type="text",
+                text=_dump(files),
+            )
+        ]
+
+    async def _tool_read_file(self, arguments: dict) -> list[TextContent]:
+        """Read content of a file by its ID."""
+        await self._ensure_service()
+
+        content = await self._download(arguments["file_id"])
+        return [TextContent(type="text", text=content)]
+
+    async def _tool_read_files(self, arguments: dict) -> list[TextContent]:
+        """Read the content of several files concurrently by their IDs."""
+        await self._ensure_service()
+
+        file_ids = arguments["file_ids"]
+        contents = await asyncio.gather(
+            *(self._download(file_id) for file_id in file_ids),
+            return_exceptions=True,
+        )
+        results = {
+            file_id: f"Error: {content}" if isinstance(content, Exception) else content
+            for file_id, content in zip(file_ids, contents)
+        }
+        return [
+            TextContent(
+                type="text",
+                text=_dump(results),
+            )
+        ]
+
+    async def _tool_write_file(self, arguments: dict) -> list[TextContent]:
+        """Create a new file in Google Drive."""
+        await self._ensure_service()
+
+        file_metadata = {"name": arguments["name"]}
+
+        if "folder_id" in arguments:
+            file_metadata["parents"] = [arguments["folder_id"]]
+
+        media = _upload_media(arguments["content"], arguments.get("mime_type", "text/plain"))
+
+        file = await self._exec(self.service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields="id, name, mimeType",
+        ))
+
+        return [
+            TextContent(
+                type="text",
+                text=f"File created successfully:\n{_dump(file)}",
+            )
+        ]
+
+    async def _tool_update_file(self, arguments: dict) -> list[TextContent]:
+        """Update an existing file's content."""
+        await self._ensure_service()
+
+        media = _upload_media(arguments["content"], "text/plain")
+
+        file = await self._exec(self.service.files().update(
+            fileId=arguments["file_id"],
+            media_body=media,
+            fields="id, name, mimeType, modifiedTime",
+        ))
+
+        return [
+            TextContent(
+                type="text",
+                text=f"File updated successfully:\n{_dump(file)}",
+            )
+        ]
+
+    async def _tool_delete_file(self, arguments: dict) -> list[TextContent]:
+        """Delete a file by its ID."""
+        await self._ensure_service()
+
+        await self._exec(self.service.files().delete(fileId=arguments["file_id"]))
+
+        return [
+            TextContent(
+                type="text",
+                text=f"File {arguments['file_id']} deleted successfully.",
+            )
+        ]
+
+    async def _tool_delete_files(self, arguments: dict) -> list[TextContent]:
+        """Delete several files concurrently by their IDs."""
+        await self._ensure_service()
+
+        file_ids = arguments["file_ids"]
+        outcomes = await asyncio.gather(
+            *(self._exec(self.service.files().delete(fileId=file_id)) for file_id in file_ids),
+            return_exceptions=True,
+        )
+        results = {
+            file_id: f"Error: {outcome}" if isinstance(outcome, Exception) else "deleted"
+            for file_id, outcome in zip(file_ids, outcomes)
+        }
+        return [
+            TextContent(
+                type="text",
+                text=_dump(results),
+            )
+        ]
+
+    async def _tool_create_folder(self, arguments: dict) -> list[TextContent]:
+        """Create a new folder in Google Drive."""
+        await self._ensure_service()
+
+        folder = await self._exec(self.service.files().create(
+            body=_folder_body(arguments),
+            fields="id, name",
+        ))
+
+        return [
+            TextContent(
+                type="text",
+                text=f"Folder created successfully:\n{_dump(folder)}",
+            )
+        ]
+
+    async def _tool_batch_file_ops(self, arguments: dict) -> list[TextContent]:
+        """Run many metadata operations (delete, create_folder, rename) in a single Drive batch request."""
+        await self._ensure_service()
+
+        results = await self._batch(arguments["operations"])
+        return [
+            TextContent(
+                type="text",
+                text=_dump(results),
+            )
+        ]
+
+    async def _tool_search_files(self, arguments: dict) -> list[TextContent]:
+        """Search for files using Google Drive query syntax."""
+        await self._ensure_service()
+
+        files = await self._list_files(arguments, arguments["query"])
+        return [
+            TextContent(
+                type="text",
+                text=_dump(files),
+            )
+        ]
+
+    async def _tool_local_search(self, arguments: dict) -> list[TextContent]:
+        """Search the local Drive metadata index by name and/or MIME type."""
+        if await asyncio.to_thread(self._index.page_token) is None:
+            raise Exception("The local Drive index is still being built; use search_files for now.")
+
+        files = await asyncio.to_thread(
+            self._index.search,
+            arguments.get("name_contains"),
+            arguments.get("mime_type"),
+            int(arguments.get("max_results", DEFAULT_MAX_RESULTS)),
+        )
+        return [
+            TextContent(
+                type="text",
+                text=_dump(files),
+            )
+        ]
+
+    async def _build_index(self) -> None:
+        """Fill the local index from a full listing of non-trashed files."""
+        # Taken before listing so changes made while listing are replayed afterwards
+        start = await self._exec(self.service.changes().getStartPageToken())
+        files: list[dict] = []
+        page_token = None
+        while True:
+            results = await self._exec(self.service.files().list(
+                q="trashed = false",
+                fields=f"nextPageToken, files({INDEX_FIELDS})",
+                pageSize=MAX_PAGE_SIZE,
+                pageToken=page_token,
+            ))
+            files.extend(results.get("files", []))
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+        await asyncio.to_thread(self._index.apply, files, [], start["startPageToken"], True)
+
+    async def _sync_index(self, page_token: str) -> None:
+        """Apply changes since page_token to the local index."""
+        while True:
+            results = await self._exec(self.service.changes().list(
+                pageToken=page_token,
+                pageSize=MAX_PAGE_SIZE,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({INDEX_FIELDS}, trashed))",
+            ))
+            upserts, removed = [], []
+            for change in results.get("changes", []):
+                file_id = change.get("fileId")
+                if file_id is None:
+                    # Shared drive changes (changeType "drive") carry no file
+                    continue
+                file = change.get("file")
+                if change.get("removed") or file is None or file.get("trashed"):
+                    removed.append(file_id)
+                else:
+                    upserts.append(file)
+            page_token = results.get("nextPageToken") or results["newStartPageToken"]
+            await asyncio.to_thread(self._index.apply, upserts, removed, page_token)
+            if "newStartPageToken" in results:
+                return
+
+    async def _indexer(self) -> None:
+        """Build the local index once credentials exist, then poll the changes feed."""
+        while True:
+            try:
+                await self._ensure_service()
+                page_token = await asyncio.to_thread(self._index.page_token)
+                if page_token is None:
+                    await self._build_index()
+                else:
+                    await self._sync_index(page_token)
+            except Exception as e:
+                # Not authenticated yet or an API error; stdout carries the MCP
+                # protocol, so report on stderr and try again next poll
+                print(f"Drive index sync failed: {e!r}", file=sys.stderr)
+            await asyncio.sleep(INDEX_POLL_INTERVAL)
+
     async def run(self):
         """Run the MCP server."""
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                self.server.create_initialization_options(),
-            )
+        refresher = asyncio.create_task(self._refresher())
+        indexer = asyncio.create_task(self._indexer()) if INDEX_ENABLED else None
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.server.create_initialization_options(),
+                )
+        finally:
+            refresher.cancel()
+            if indexer is not None:
+                indexer.cancel()
+                self._index.close()
 
-    def test_credentials(self) -> dict:
+    async def test_credentials(self) -> dict:
         """Test whether the stored credentials are valid."""
-        if not self.service:
-            self.load_credentials()
+        await self._ensure_service()
 
         # This endpoint is very cheap and auth-protected
-        about = self.service.about().get(fields="user, storageQuota").execute()
+        about = await self._exec(self.service.about().get(fields="user, storageQuota"))
 
         return {
             "email": about["user"]["emailAddress"],
@@ -468,7 +1143,7 @@ class GoogleDriveMCPServer:
 #     server.save_token(code)
 
 #     # 4. Verify credentials
-#     info = server.test_credentials()
+#     info = await server.test_credentials()
 #     print("✅ Auth OK for:", info["email"])
 
 async def main():
@@ -7,7 +7,8 @@ sys.path.insert(0, str(project_root))
 
 from langchain_core.messages import SystemMessage, HumanMessage
 from dotenv import load_dotenv
-from graph.graph import get_graph
+from graph.graph import get_graph, close_graph
+from mcp_client import disconnect_all, warmup
 import asyncio
 
 load_dotenv()
@@ -37,6 +38,8 @@ TEST_QUESTIONS = [
 
 
 async def main():
+    # Bring all MCP servers up in parallel before anything waits on them
+    await warmup()
     chatbot = await get_graph()
     print("=" * 60)
     print("Starting Chatbot Test with Predefined Questions")
@@ -44,7 +47,11 @@ async def main():
     print()
     
     thread_id = "test-thread"
-    initialized = False
+    config = {"configurable": {"thread_id": thread_id}}
+
+    # A resumed thread already carries the system prompt from its first run
+    snapshot = await chatbot.aget_state(config)
+    initialized = bool(snapshot.values.get("messages"))
     
     for idx, question in enumerate(TEST_QUESTIONS, 1):
         print(f"\n{'=' * 60}")
@@ -63,10 +70,7 @@ async def main():
         state = {"messages": messages}
         
         try:
-            result = await chatbot.ainvoke(
-                state,
-                config={"configurable": {"thread_id": thread_id}},
-            )
+            result = await chatbot.ainvoke(state, config=config)
             
             response = result["messages"][-1].content
             print(f"\nBot: {response}")
@@ -74,10 +78,10 @@ async def main():
         except Exception as e:
             print(f"\nError processing question: {str(e)}")
             print(f"Error type: {type(e).__name__}")
-        
-        # Optional: Add a small delay between questions
-        await asyncio.sleep(1)
     
+    await close_graph()
+    await disconnect_all()
+
     print("\n" + "=" * 60)
     print("Test completed!")
     print("=" * 60)